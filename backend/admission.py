@@ -0,0 +1,140 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi.responses import JSONResponse
+
+# Endpoints that never touch the database are not limited
+UNLIMITED_PATHS = {"/api/health", "/api/config", "/api/metrics"}
+
+MAX_TRACKED_CLIENTS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success or seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Per-client token buckets plus a global cap on in-flight DB-bound requests.
+
+    Requests over either limit are rejected immediately instead of queueing
+    for a database connection. All state lives on the event loop thread.
+    """
+
+    def __init__(self, rate: float, burst: int, max_concurrent: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+
+    def applies(self, path: str) -> bool:
+        return path.startswith("/api/") and path not in UNLIMITED_PATHS
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket:
+            self._buckets.move_to_end(key)
+            return bucket
+        bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        # An evicted bucket would have refilled anyway, so dropping the oldest is safe
+        if len(self._buckets) > MAX_TRACKED_CLIENTS:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def check_rate(self, keys: list[str]) -> float:
+        """Charge every key's bucket; returns seconds to wait if any is empty."""
+        wait = max(self._bucket(key).take() for key in keys)
+        if wait:
+            self.rate_limited += 1
+        return wait
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.max_concurrent:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "shed": self.shed,
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "tracked_clients": len(self._buckets),
+        }
+
+
+def client_keys(scope) -> list[str]:
+    """Rate-limit keys for a request: the client IP, plus the organizer token if sent."""
+    headers = dict(scope["headers"])
+    forwarded: Optional[bytes] = headers.get(b"x-forwarded-for")
+    if forwarded:
+        # The right-most entry is the one appended by our own proxy
+        ip = forwarded.decode("latin-1").split(",")[-1].strip()
+    else:
+        ip = scope["client"][0] if scope.get("client") else "unknown"
+
+    keys = [f"ip:{ip}"]
+    token = headers.get(b"x-organizer-token")
+    if token:
+        keys.append(f"organizer:{token.decode('latin-1')}")
+    return keys
+
+
+def rejection(status_code: int, message: str, path: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": True, "status_code": status_code, "message": message, "path": path},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.applies(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.controller.check_rate(client_keys(scope))
+        if wait:
+            response = rejection(429, "Too many requests", scope["path"], wait)
+            await response(scope, receive, send)
+            return
+
+        if not self.controller.try_acquire():
+            response = rejection(503, "Server busy, please retry", scope["path"], 1)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
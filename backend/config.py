@@ -15,12 +15,19 @@ DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 # Database - parse DATABASE_URL for PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
-def get_db_config():
-    """Parse DATABASE_URL into connection parameters."""
-    if not DATABASE_URL:
+# Optional comma-separated read replicas for read-only endpoints
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+# After a client writes, its reads go to the primary for this many seconds
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+def get_db_config(url: str = None):
+    """Parse DATABASE_URL (or the given URL) into connection parameters."""
+    url = url or DATABASE_URL
+    if not url:
         raise ValueError("DATABASE_URL environment variable is required")
 
-    parsed = urlparse(DATABASE_URL)
+    parsed = urlparse(url)
     return {
         "host": parsed.hostname,
         "port": parsed.port or 5432,
@@ -29,9 +36,52 @@ def get_db_config():
         "password": parsed.password,
     }
 
+# Availability write buffer: saves for the same game arriving within the
+# window are coalesced into one upsert. AVAILABILITY_ACK is "flush" (respond
+# once the batch is committed) or "buffered" (respond as soon as it is queued).
+AVAILABILITY_FLUSH_MS = int(os.getenv("AVAILABILITY_FLUSH_MS", "50"))
+AVAILABILITY_ACK = os.getenv("AVAILABILITY_ACK", "flush").lower()
+
+# Retention: games older than RETENTION_DAYS are archived (or just deleted when
+# RETENTION_ARCHIVE is false) in small batches. 0 disables removing games.
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "0"))
+RETENTION_ARCHIVE = os.getenv("RETENTION_ARCHIVE", "true").lower() == "true"
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_INTERVAL_MINUTES = int(os.getenv("RETENTION_INTERVAL_MINUTES", "60"))
+
+# Batched mutation results older than this are pruned by the retention job.
+# A retry reusing an idempotency key is answered from its record for at least
+# this long (and at most one retention interval longer); after that the key
+# is applied as new. 0 keeps results until their game is deleted.
+MUTATION_RESULT_TTL_HOURS = int(os.getenv("MUTATION_RESULT_TTL_HOURS", "24"))
+
+# Inline /api/config into served pages so first paint needs no extra request
+INLINE_CONFIG = os.getenv("INLINE_CONFIG", "true").lower() == "true"
+
+# Worker processes; server.py sets this before the app is imported
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+# Connections all workers together may hold (Render's free tier allows 97;
+# the default leaves room for migrations and psql sessions)
+DATABASE_MAX_CONNECTIONS = int(os.getenv("DATABASE_MAX_CONNECTIONS", "90"))
+
+# Admission control: per-client token bucket (requests/second and burst) and a
+# cap on concurrent DB-bound requests. Excess requests get 429/503. Each worker
+# keeps its own buckets, so the limits are split between workers, and the DB
+# cap shrinks so workers x cap stays within DATABASE_MAX_CONNECTIONS.
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "10")) / WEB_CONCURRENCY
+RATE_LIMIT_BURST = max(1, int(os.getenv("RATE_LIMIT_BURST", "40")) // WEB_CONCURRENCY)
+MAX_CONCURRENT_DB_REQUESTS = max(1, min(
+    int(os.getenv("MAX_CONCURRENT_DB_REQUESTS", "32")),
+    DATABASE_MAX_CONNECTIONS // WEB_CONCURRENCY,
+))
+
 # CORS
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 
 # Paths
 ROOT_DIR = Path(__file__).parent.parent
 STATIC_DIR = ROOT_DIR / "static"
+
+# Precomputed responses for locked games, served without touching the database
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", str(ROOT_DIR / "snapshots")))
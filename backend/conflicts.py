@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from typing import Optional
+from constants import DAYS
+
+
+def slot_date(game_date: date, day: str) -> date:
+    """Calendar date of a weekday in the game's week.
+
+    Weeks run Saturday to Friday, matching the day tabs in playermode: a
+    Saturday game's Sunday is the next day, and a Sunday game's Saturday is
+    the day before.
+
+    >>> slot_date(date(2026, 10, 24), "sunday")
+    datetime.date(2026, 10, 25)
+    >>> slot_date(date(2026, 10, 25), "sunday")
+    datetime.date(2026, 10, 25)
+    >>> slot_date(date(2026, 10, 25), "saturday")
+    datetime.date(2026, 10, 24)
+    """
+    week_start = game_date - timedelta(days=(game_date.weekday() - 5) % 7)
+    return week_start + timedelta(days=(DAYS.index(day) + 1) % 7)
+
+
+def analyze_availability(rows, top: int = 5, today: Optional[date] = None) -> dict:
+    """Find double-bookings and the best combined slots across games.
+
+    rows are (game_id, game_date, player_name, day, time_slot) for available
+    slots. Every (date, time_slot) gets a bit index, and each player has one
+    bitmask per game. Overlaps then fall out of AND/OR over the masks, so a
+    player's conflicts cost one pass over their games instead of comparing
+    slots pairwise. Slots dated before today are skipped.
+
+    A Saturday game and the next day's Sunday game share that Sunday:
+
+    >>> analyze_availability([
+    ...     ("sat", date(2026, 10, 24), "Bob", "sunday", "10:00"),
+    ...     ("sun", date(2026, 10, 25), "Bob", "sunday", "10:00"),
+    ... ])["conflicts"]
+    [{'player_name': 'Bob', 'date': '2026-10-25', 'day': 'sunday', 'time_slot': '10:00', 'game_ids': ['sat', 'sun']}]
+    """
+    slot_index: dict[tuple[date, str], int] = {}
+    masks: dict[str, dict[str, int]] = {}  # player key -> game_id -> bitmask
+    display_names: dict[str, str] = {}
+
+    for game_id, game_date, player_name, day, time_slot in rows:
+        slot_on = slot_date(game_date, day)
+        if today and slot_on < today:
+            continue
+        key = player_name.strip().lower()
+        display_names.setdefault(key, player_name.strip())
+        bit = slot_index.setdefault((slot_on, time_slot), len(slot_index))
+        player_masks = masks.setdefault(key, {})
+        player_masks[game_id] = player_masks.get(game_id, 0) | (1 << bit)
+
+    slots = sorted(slot_index, key=slot_index.get)
+    slot_players: list[list[str]] = [[] for _ in slots]
+    conflicts = []
+
+    for key, games in masks.items():
+        seen = 0
+        doubled = 0
+        for mask in games.values():
+            doubled |= seen & mask
+            seen |= mask
+
+        for bit in iter_bits(seen):
+            slot_players[bit].append(display_names[key])
+
+        for bit in iter_bits(doubled):
+            slot_on, time_slot = slots[bit]
+            conflicts.append({
+                "player_name": display_names[key],
+                "date": slot_on.isoformat(),
+                "day": DAYS[(slot_on.weekday() + 1) % 7],
+                "time_slot": time_slot,
+                "game_ids": sorted(game_id for game_id, mask in games.items() if mask >> bit & 1),
+            })
+
+    best = sorted(range(len(slots)), key=lambda i: (-len(slot_players[i]), slots[i]))[:top]
+    best_slots = [{
+        "date": slots[i][0].isoformat(),
+        "day": DAYS[(slots[i][0].weekday() + 1) % 7],
+        "time_slot": slots[i][1],
+        "available_count": len(slot_players[i]),
+        "available_players": sorted(slot_players[i]),
+    } for i in best if slot_players[i]]
+
+    conflicts.sort(key=lambda c: (c["date"], c["time_slot"], c["player_name"]))
+    return {"conflicts": conflicts, "best_slots": best_slots}
+
+
+def iter_bits(mask: int):
+    """Yield the indexes of set bits, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
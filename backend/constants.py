@@ -26,6 +26,14 @@ GAME_TITLE_MAX_LENGTH = 50
 
 PLAYER_NAME_MAX_LENGTH = 30
 
+# Recurring game series
+SERIES_MAX_GAMES = 26
+RECURRENCE_INTERVAL_DAYS = {"daily": 1, "weekly": 7, "biweekly": 14}
+
+# Batched mutations
+MUTATION_BATCH_MAX = 50
+IDEMPOTENCY_KEY_MAX_LENGTH = 100
+
 # Predefined player roster
 PLAYER_ROSTER = [
     "David", "Jasmine", "Mike", "Travis", "Luis",
@@ -1,20 +1,42 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from contextlib import contextmanager
-from config import get_db_config
+from config import get_db_config, DATABASE_REPLICA_URLS
+from replicas import ReplicaRouter
 
-@contextmanager
-def get_db():
-    """Get a database connection with automatic commit/rollback."""
-    config = get_db_config()
-    conn = psycopg2.connect(
+# When set to a list, every executed statement is appended to it. Used by
+# scripts/check_query_budgets.py to count queries per request.
+statement_log = None
+
+
+class LoggingCursor(RealDictCursor):
+    def execute(self, query, vars=None):
+        if statement_log is not None:
+            statement_log.append(query.decode() if isinstance(query, bytes) else str(query))
+        return super().execute(query, vars)
+
+
+def connect(config: dict, **kwargs):
+    return psycopg2.connect(
         host=config["host"],
         port=config["port"],
         database=config["database"],
         user=config["user"],
         password=config["password"],
-        cursor_factory=RealDictCursor
+        cursor_factory=LoggingCursor,
+        **kwargs
     )
+
+
+replica_router = ReplicaRouter(
+    [get_db_config(url) for url in DATABASE_REPLICA_URLS],
+    lambda config: connect(config, connect_timeout=3),
+)
+
+
+@contextmanager
+def managed(conn):
+    """Commit on success, roll back on error, always close."""
     try:
         yield conn
         conn.commit()
@@ -25,10 +47,72 @@ def get_db():
         conn.close()
 
 
+@contextmanager
+def get_db():
+    """Get a database connection with automatic commit/rollback."""
+    with managed(connect(get_db_config())) as conn:
+        yield conn
+
+
+@contextmanager
+def get_read_db():
+    """Connection for read-only handlers: a replica when one is configured and
+    healthy, otherwise the primary."""
+    conn = replica_router.connect() or connect(get_db_config())
+    with managed(conn) as conn:
+        yield conn
+
+
+def upsert_availability(cursor, game_id: str, rows) -> set[tuple]:
+    """Upsert (player_id, day, time_slot, status) rows for a game in one statement.
+
+    Rows must be unique per (player_id, day, time_slot). Rows for players that
+    are not (or no longer) in the game are skipped rather than failing the
+    whole statement, and so are rows for a locked game: saves still buffered
+    in any worker when a game is locked never land after it. Returns the
+    (player_id, day, time_slot) keys that were written.
+    """
+    rows = [(game_id, player_id, day, time_slot, status) for player_id, day, time_slot, status in rows]
+    if not rows:
+        return set()
+    written = execute_values(cursor, """
+        WITH incoming (game_id, player_id, day, time_slot, status) AS (VALUES %s),
+        live_players AS (
+            -- KEY SHARE waits for a concurrent delete to finish and then skips
+            -- the deleted player, instead of the insert failing its FK check
+            SELECT id FROM players
+            WHERE id IN (SELECT player_id FROM incoming) AND game_id IN (SELECT game_id FROM incoming)
+            FOR KEY SHARE
+        ),
+        open_games AS (
+            -- Waits for a lock being taken (set_game_lock holds FOR UPDATE)
+            -- and then re-checks locked_at, so the write lands before the
+            -- lock or not at all
+            SELECT id FROM games
+            WHERE id IN (SELECT game_id FROM incoming) AND locked_at IS NULL
+            FOR KEY SHARE
+        )
+        INSERT INTO availability (game_id, player_id, day, time_slot, status)
+        SELECT game_id, player_id, day, time_slot, status FROM incoming
+        WHERE player_id IN (SELECT id FROM live_players)
+          AND game_id IN (SELECT id FROM open_games)
+        ON CONFLICT(game_id, player_id, day, time_slot)
+        DO UPDATE SET status = EXCLUDED.status, updated_at = CURRENT_TIMESTAMP,
+                      change_xid = pg_current_xact_id()
+        RETURNING player_id, day, time_slot
+    """, rows, page_size=len(rows), fetch=True)
+    return {(row["player_id"], row["day"], row["time_slot"]) for row in written}
+
+
+# Arbitrary key serializing schema setup across workers starting together
+INIT_DB_LOCK_KEY = 7412030
+
+
 def init_db():
     """Initialize database schema."""
     with get_db() as conn:
         cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (INIT_DB_LOCK_KEY,))
 
         # Organizers table (new)
         cursor.execute("""
@@ -94,6 +178,74 @@ def init_db():
             )
         """)
 
+        # Archived snapshots of games removed by the retention job
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archived_games (
+                id TEXT PRIMARY KEY,
+                organizer_id UUID,
+                game_date DATE NOT NULL,
+                data JSONB NOT NULL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Date-range scans (list_games cutoff, retention) use this index
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_game_date ON games(game_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_organizer_date ON games(organizer_id, game_date)")
+
+        # Recurring series: games created together share a series_id
+        cursor.execute("ALTER TABLE games ADD COLUMN IF NOT EXISTS series_id TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_series_id ON games(series_id, game_date)")
+
+        # Locked games reject writes and are served from snapshots
+        cursor.execute("ALTER TABLE games ADD COLUMN IF NOT EXISTS locked_at TIMESTAMP")
+
+        # Deleted players, so availability delta sync can report removals
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS player_tombstones (
+                game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+                player_id INTEGER NOT NULL,
+                deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (game_id, player_id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_player_tombstones_deleted ON player_tombstones(game_id, deleted_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_availability_game_updated ON availability(game_id, updated_at)")
+
+        # Outcome of each batched mutation, so retried batches are answered
+        # from here instead of being applied twice
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS mutation_results (
+                game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+                idempotency_key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                body JSONB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (game_id, idempotency_key)
+            )
+        """)
+        # Retention prunes results past MUTATION_RESULT_TTL_HOURS by age
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_mutation_results_created ON mutation_results(created_at)")
+
+        # Track row changes so incremental sync can use a high-water mark
+        for table in ("organizers", "games", "players"):
+            cursor.execute(f"""
+                ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            """)
+
+        # Writing transaction's id, for availability delta sync. Unlike a
+        # timestamp it orders rows by what a later snapshot can see: any row
+        # committed after a read has an id at or above that read's xmin.
+        for table in ("availability", "players", "player_tombstones"):
+            cursor.execute(f"""
+                ALTER TABLE {table}
+                ADD COLUMN IF NOT EXISTS change_xid xid8 NOT NULL DEFAULT pg_current_xact_id()
+            """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_availability_game_change ON availability(game_id, change_xid)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_player_tombstones_change ON player_tombstones(game_id, change_xid)")
+
         conn.commit()
 
 
@@ -0,0 +1,132 @@
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional
+from xml.sax.saxutils import escape
+from constants import TIME_SLOTS
+from models import GameResponse, HeatmapResponse
+
+PRIMARY = (0x2B, 0x8C, 0xEE)
+EMPTY = (0xE5, 0xE7, 0xEB)
+BACKGROUND = (0xFF, 0xFF, 0xFF)
+
+CELL_WIDTH = 72
+CELL_HEIGHT = 22
+LABEL_WIDTH = 56
+HEADER_HEIGHT = 48
+GAP = 2
+
+
+def cell_color(available: int, needed: int) -> tuple[int, int, int]:
+    """Blend from grey to the primary color as a slot approaches min players."""
+    ratio = min(1.0, available / needed) if needed else 0.0
+    return tuple(round(e + (p - e) * ratio) for e, p in zip(EMPTY, PRIMARY))
+
+
+def heatmap_grid(game: GameResponse, heatmap: list[HeatmapResponse]) -> tuple[list[str], list[list[int]]]:
+    """Return (days, counts) where counts[slot][day] is the available count."""
+    days = game.selected_days or [h.day for h in heatmap]
+    by_day = {h.day: {s.time_slot: s.available_count for s in h.slots} for h in heatmap}
+    counts = [[by_day.get(day, {}).get(slot, 0) for day in days] for slot in TIME_SLOTS]
+    return days, counts
+
+
+def render_svg(game: GameResponse, heatmap: list[HeatmapResponse]) -> bytes:
+    days, counts = heatmap_grid(game, heatmap)
+    needed = game.min_players or 4
+    width = LABEL_WIDTH + len(days) * (CELL_WIDTH + GAP)
+    height = HEADER_HEIGHT + len(TIME_SLOTS) * (CELL_HEIGHT + GAP)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Inter, sans-serif" font-size="11">',
+        f'<rect width="{width}" height="{height}" fill="#ffffff"/>',
+        f'<text x="8" y="18" font-size="14" font-weight="bold" fill="#111827">{escape(game.title)}</text>',
+    ]
+    for col, day in enumerate(days):
+        x = LABEL_WIDTH + col * (CELL_WIDTH + GAP)
+        parts.append(f'<text x="{x + CELL_WIDTH // 2}" y="{HEADER_HEIGHT - 8}" text-anchor="middle" '
+                     f'fill="#6b7280">{escape(day[:3].title())}</text>')
+    for row, slot in enumerate(TIME_SLOTS):
+        y = HEADER_HEIGHT + row * (CELL_HEIGHT + GAP)
+        parts.append(f'<text x="8" y="{y + 15}" fill="#6b7280">{slot}</text>')
+        for col, count in enumerate(counts[row]):
+            x = LABEL_WIDTH + col * (CELL_WIDTH + GAP)
+            r, g, b = cell_color(count, needed)
+            parts.append(f'<rect x="{x}" y="{y}" width="{CELL_WIDTH}" height="{CELL_HEIGHT}" rx="4" '
+                         f'fill="#{r:02x}{g:02x}{b:02x}"/>')
+            if count:
+                text_fill = "#ffffff" if count >= needed else "#111827"
+                parts.append(f'<text x="{x + CELL_WIDTH // 2}" y="{y + 15}" text-anchor="middle" '
+                             f'fill="{text_fill}">{count}/{needed}</text>')
+    parts.append("</svg>")
+    return "".join(parts).encode()
+
+
+def render_png(game: GameResponse, heatmap: list[HeatmapResponse], scale: int = 1) -> bytes:
+    """Render the same grid as a PNG using only zlib.
+
+    Text is not drawn; the SVG carries labels, the PNG is for clients that
+    cannot show SVG previews.
+    """
+    days, counts = heatmap_grid(game, heatmap)
+    needed = game.min_players or 4
+    cell_w, cell_h, gap = CELL_WIDTH * scale, CELL_HEIGHT * scale, GAP * scale
+    width = max(1, len(days)) * (cell_w + gap) + gap
+    height = len(TIME_SLOTS) * (cell_h + gap) + gap
+
+    rows = []
+    background_row = bytes(BACKGROUND) * width
+    for slot_counts in counts:
+        line = bytearray(bytes(BACKGROUND) * gap)
+        for count in slot_counts:
+            line += bytes(cell_color(count, needed)) * cell_w + bytes(BACKGROUND) * gap
+        line += bytes(BACKGROUND) * (width - len(line) // 3)
+        rows.extend([background_row] * gap)
+        rows.extend([bytes(line)] * cell_h)
+    rows.extend([background_row] * gap)
+
+    raw = b"".join(b"\x00" + row for row in rows)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        png_chunk(b"IDAT", zlib.compress(raw, 9)),
+        png_chunk(b"IEND", b""),
+    ])
+
+
+class RenderCache:
+    """LRU of rendered images keyed by (game_id, format), valid for one game version."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def get(self, game_id: str, fmt: str, version: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get((game_id, fmt))
+            if not entry or entry[0] != version:
+                return None
+            self._entries.move_to_end((game_id, fmt))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, game_id: str, fmt: str, version: str, body: bytes):
+        with self._lock:
+            self._entries[(game_id, fmt)] = (version, body)
+            self._entries.move_to_end((game_id, fmt))
+            self.renders += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "renders": self.renders}
+
+
+def png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
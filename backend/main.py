@@ -1,21 +1,50 @@
+import asyncio
+import anyio
+import hashlib
 import json
+import logging
 import secrets
-from typing import Optional
+from datetime import date, timedelta
+from typing import Optional, Union
 from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
-from psycopg2.extras import Json
-from config import STATIC_DIR, CORS_ORIGINS, PORT, HOST, DEBUG
-from database import get_db, init_db
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
+from psycopg2.extras import Json, execute_values
+from config import (
+    STATIC_DIR, CORS_ORIGINS, PORT, HOST, DEBUG,
+    AVAILABILITY_FLUSH_MS, AVAILABILITY_ACK, INLINE_CONFIG, RETENTION_DAYS, MUTATION_RESULT_TTL_HOURS,
+    RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST, MAX_CONCURRENT_DB_REQUESTS,
+    DATABASE_REPLICA_URLS, REPLICA_STICKY_SECONDS
+)
+from database import get_db, get_read_db, init_db, upsert_availability, replica_router
+from write_buffer import AvailabilityWriteBuffer
+from static_assets import StaticAssets, cached_response, content_etag, etag_matches
+from player_index import PlayerHistoryIndex
+from retention import retention_loop
+from admission import AdmissionController, AdmissionMiddleware
+from replicas import ReadYourWritesMiddleware, prefer_primary
+from heatmap_image import RenderCache, render_svg, render_png
+from conflicts import analyze_availability
+from singleflight import SingleFlight
+from snapshots import snapshot_store
 from models import (
     GameCreate, GameResponse,
     PlayerCreate, PlayerResponse,
-    AvailabilityBulkCreate, AvailabilityResponse,
-    HeatmapSlot, HeatmapResponse,
+    AvailabilityBulkCreate, AvailabilityResponse, AvailabilityDeltaResponse,
+    HeatmapSlot, HeatmapResponse, GameBootstrapResponse,
+    GameSeriesCreate, GameSeriesResponse, OrganizerConflictsResponse,
+    MutationBatch, MutationBatchResponse, MutationResult, JoinMutation, RenameMutation,
     OrganizerAuth, OrganizerCreate, OrganizerResponse, OrganizerUpdate
 )
-from constants import VENUES, TIME_SLOTS, DAYS, MAX_PLAYERS_DEFAULT, MAX_PLAYERS_MIN, MAX_PLAYERS_MAX, PLAYER_ROSTER
+from constants import (
+    VENUES, TIME_SLOTS, DAYS, MAX_PLAYERS_DEFAULT, MAX_PLAYERS_MIN, MAX_PLAYERS_MAX, PLAYER_ROSTER,
+    RECURRENCE_INTERVAL_DAYS
+)
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="VB Scheduler API",
@@ -24,6 +53,17 @@ app = FastAPI(
     redoc_url="/api/redoc" if DEBUG else None,
 )
 
+admission = AdmissionController(
+    rate=RATE_LIMIT_PER_SECOND,
+    burst=RATE_LIMIT_BURST,
+    max_concurrent=MAX_CONCURRENT_DB_REQUESTS,
+)
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+if DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=REPLICA_STICKY_SECONDS)
+
+# Added last so it wraps admission rejections too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -32,7 +72,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+static_assets = StaticAssets(STATIC_DIR)
+
+# Concurrent identical reads (e.g. everyone opening a freshly shared game link)
+# share one query instead of each taking a connection
+read_flights = SingleFlight()
+
+availability_buffer = AvailabilityWriteBuffer(
+    window_ms=AVAILABILITY_FLUSH_MS,
+    ack_after_flush=AVAILABILITY_ACK != "buffered",
+)
 
 
 @app.exception_handler(HTTPException)
@@ -52,8 +101,23 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 
 @app.on_event("startup")
-def startup():
-    init_db()
+async def startup():
+    # Sync handlers run in this threadpool and each holds at most one DB
+    # connection, so its size bounds connections per worker
+    anyio.to_thread.current_default_thread_limiter().total_tokens = MAX_CONCURRENT_DB_REQUESTS
+    await run_in_threadpool(init_db)
+    static_assets.load(head_html=CONFIG_SCRIPT if INLINE_CONFIG else "")
+    app.state.snapshot_task = asyncio.create_task(run_in_threadpool(rebuild_missing_snapshots))
+    if RETENTION_DAYS > 0 or MUTATION_RESULT_TTL_HOURS > 0:
+        app.state.retention_task = asyncio.create_task(retention_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    retention_task = getattr(app.state, "retention_task", None)
+    if retention_task:
+        retention_task.cancel()
+    await availability_buffer.drain()
 
 
 def generate_game_id() -> str:
@@ -98,7 +162,7 @@ def update_organizer(organizer_id: str, update: OrganizerUpdate, x_organizer_tok
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            "UPDATE organizers SET name = %s WHERE id = %s RETURNING *",
+            "UPDATE organizers SET name = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s RETURNING *",
             (update.name, organizer_id)
         )
         row = cursor.fetchone()
@@ -122,27 +186,49 @@ def get_organizer_games(organizer_id: str):
         return [GameResponse(**dict(row)) for row in rows]
 
 
+@app.get("/api/organizers/{organizer_id}/conflicts", response_model=OrganizerConflictsResponse)
+def get_organizer_conflicts(organizer_id: str):
+    """Players marked available in overlapping slots of the organizer's upcoming
+    games, plus the slots with the most players across all of them."""
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT g.id as game_id, g.game_date, p.name, a.day, a.time_slot
+            FROM games g
+            LEFT JOIN availability a ON a.game_id = g.id AND a.status = 'available'
+            LEFT JOIN players p ON a.player_id = p.id
+            WHERE g.organizer_id = %s AND g.game_date >= CURRENT_DATE
+        """, (organizer_id,))
+        rows = cursor.fetchall()
+
+    game_ids = sorted({row["game_id"] for row in rows})
+    analysis = analyze_availability(
+        [(row["game_id"], row["game_date"], row["name"], row["day"], row["time_slot"])
+         for row in rows if row["name"]],
+        today=date.today(),
+    )
+    return OrganizerConflictsResponse(game_ids=game_ids, **analysis)
+
+
+def load_player_history(organizer_id: str, limit: int) -> list[tuple[str, float]]:
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT player_name, EXTRACT(EPOCH FROM last_used) as score FROM player_history
+            WHERE organizer_id = %s
+            ORDER BY last_used DESC
+            LIMIT %s
+        """, (organizer_id, limit))
+        return [(row["player_name"], float(row["score"] or 0)) for row in cursor.fetchall()]
+
+
+player_history_index = PlayerHistoryIndex(load_player_history)
+
+
 @app.get("/api/organizers/{organizer_id}/player-history")
 def get_player_history(organizer_id: str, q: str = ""):
     """Get player name suggestions for autocomplete."""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        if q:
-            cursor.execute("""
-                SELECT player_name FROM player_history
-                WHERE organizer_id = %s AND player_name ILIKE %s
-                ORDER BY last_used DESC
-                LIMIT 20
-            """, (organizer_id, f"%{q}%"))
-        else:
-            cursor.execute("""
-                SELECT player_name FROM player_history
-                WHERE organizer_id = %s
-                ORDER BY last_used DESC
-                LIMIT 20
-            """, (organizer_id,))
-        rows = cursor.fetchall()
-        return [row["player_name"] for row in rows]
+    return player_history_index.search(organizer_id, q)
 
 
 # ============ GAMES ============
@@ -181,7 +267,7 @@ def list_games(days: int = 14, limit: int = 20):
     from datetime import datetime, timedelta
     cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
 
-    with get_db() as conn:
+    with get_read_db() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT g.*, o.name as organizer_name
@@ -201,22 +287,58 @@ def list_games(days: int = 14, limit: int = 20):
         return results
 
 
+def fetch_game(cursor, game_id: str) -> GameResponse:
+    cursor.execute("""
+        SELECT g.*, o.name as organizer_name
+        FROM games g
+        LEFT JOIN organizers o ON g.organizer_id = o.id
+        WHERE g.id = %s
+    """, (game_id,))
+    row = cursor.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Game not found")
+    data = dict(row)
+    data.pop('organizer_pin', None)
+    return GameResponse(**data)
+
+
+async def coalesced_read(endpoint: str, game_id: str, fetch):
+    """Run fetch on a read connection, sharing the result with identical requests
+    already in flight. Requests pinned to the primary after a write are keyed
+    apart so they never receive a replica's result."""
+    def load():
+        with get_read_db() as conn:
+            return fetch(conn.cursor(), game_id)
+
+    key = (endpoint, game_id, prefer_primary.get())
+    return await read_flights.do_async(key, lambda: run_in_threadpool(load))
+
+
 @app.get("/api/games/{game_id}", response_model=GameResponse)
-def get_game(game_id: str):
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT g.*, o.name as organizer_name
-            FROM games g
-            LEFT JOIN organizers o ON g.organizer_id = o.id
-            WHERE g.id = %s
-        """, (game_id,))
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Game not found")
-        data = dict(row)
-        data.pop('organizer_pin', None)
-        return GameResponse(**data)
+async def get_game(request: Request, game_id: str):
+    return (await run_in_threadpool(snapshot_store.response, request, game_id, "game")
+            or await coalesced_read("game", game_id, fetch_game))
+
+
+def fetch_bootstrap(cursor, game_id: str) -> GameBootstrapResponse:
+    return GameBootstrapResponse(
+        game=fetch_game(cursor, game_id),
+        players=fetch_players(cursor, game_id),
+        availability=fetch_availability(cursor, game_id),
+        heatmap=fetch_heatmap(cursor, game_id),
+    )
+
+
+@app.get("/api/games/{game_id}/bootstrap", response_model=GameBootstrapResponse)
+def get_game_bootstrap(request: Request, game_id: str):
+    """Everything the game page needs on load, read from one consistent snapshot."""
+    snapshot = snapshot_store.response(request, game_id, "bootstrap")
+    if snapshot:
+        return snapshot
+
+    with get_read_db() as conn:
+        conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+        return fetch_bootstrap(conn.cursor(), game_id)
 
 
 @app.put("/api/games/{game_id}", response_model=GameResponse)
@@ -224,7 +346,9 @@ def update_game(game_id: str, game: GameCreate, x_organizer_token: Optional[str]
     with get_db() as conn:
         cursor = conn.cursor()
 
-        cursor.execute("SELECT organizer_id, organizer_pin FROM games WHERE id = %s", (game_id,))
+        # The UPDATE below needs this lock anyway; taking it here makes a lock
+        # in progress commit first, so the locked_at check sees it
+        cursor.execute("SELECT organizer_id, organizer_pin, locked_at FROM games WHERE id = %s FOR NO KEY UPDATE", (game_id,))
         existing = cursor.fetchone()
         if not existing:
             raise HTTPException(status_code=404, detail="Game not found")
@@ -234,9 +358,10 @@ def update_game(game_id: str, game: GameCreate, x_organizer_token: Optional[str]
 
         if not is_organizer and not pin_matches and existing["organizer_pin"]:
             raise HTTPException(status_code=403, detail="Not authorized to update this game")
+        ensure_unlocked(existing)
 
         cursor.execute("""
-            UPDATE games SET title=%s, venue=%s, game_date=%s, start_time=%s, end_time=%s, max_players=%s, min_players=%s, selected_days=%s, organizer_pin=%s
+            UPDATE games SET title=%s, venue=%s, game_date=%s, start_time=%s, end_time=%s, max_players=%s, min_players=%s, selected_days=%s, organizer_pin=%s, updated_at=CURRENT_TIMESTAMP
             WHERE id = %s
             RETURNING *
         """, (game.title, game.venue, game.game_date, game.start_time, game.end_time, game.max_players, game.min_players, Json(game.selected_days), game.organizer_pin, game_id))
@@ -267,7 +392,114 @@ def delete_game(game_id: str, x_organizer_token: Optional[str] = Header(None)):
             raise HTTPException(status_code=403, detail="Not authorized to delete this game")
 
         cursor.execute("DELETE FROM games WHERE id = %s", (game_id,))
-        return {"message": "Game deleted"}
+
+    snapshot_store.remove(game_id)
+    return {"message": "Game deleted"}
+
+
+def ensure_unlocked(game):
+    """Reject writes to a locked game.
+
+    Callers read locked_at with a row lock (KEY SHARE or stronger). That
+    conflicts with set_game_lock's FOR UPDATE, so a write either commits
+    before the lock, and is in the published snapshot, or waits and then
+    sees the game locked.
+    """
+    if game["locked_at"]:
+        raise HTTPException(status_code=409, detail="Game is locked")
+
+
+def set_game_lock(game_id: str, x_organizer_token: Optional[str], locked: bool):
+    with get_db() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT organizer_id FROM games WHERE id = %s FOR UPDATE", (game_id,))
+        existing = cursor.fetchone()
+        if not existing:
+            raise HTTPException(status_code=404, detail="Game not found")
+
+        is_organizer = x_organizer_token and existing["organizer_id"] == x_organizer_token
+        if not is_organizer:
+            raise HTTPException(status_code=403, detail="Only the organizer can lock or unlock this game")
+
+        if not locked:
+            # Drop the snapshot before writes are allowed again; in between,
+            # reads fall back to the database, which has the same data
+            snapshot_store.remove(game_id)
+
+        cursor.execute("""
+            UPDATE games
+            SET locked_at = CASE WHEN %s THEN COALESCE(locked_at, CURRENT_TIMESTAMP) END,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (locked, game_id))
+
+
+def publish_snapshot(game_id: str) -> GameResponse:
+    """Write the read endpoints' responses for a locked game to disk.
+
+    Does nothing if the game has been unlocked meanwhile, and removes what it
+    wrote if an unlock commits while it was writing.
+    """
+    with get_db() as conn:
+        conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+        bootstrap = fetch_bootstrap(conn.cursor(), game_id)
+    if not bootstrap.game.locked_at:
+        return bootstrap.game
+
+    def encode(value) -> bytes:
+        return json.dumps(jsonable_encoder(value), separators=(",", ":")).encode()
+
+    snapshot_store.write(game_id, {
+        "game": encode(bootstrap.game),
+        "players": encode(bootstrap.players),
+        "availability": encode(bootstrap.availability),
+        "heatmap": encode(bootstrap.heatmap),
+        "bootstrap": encode(bootstrap),
+    })
+
+    # An unlock removes the snapshot while holding the game row FOR UPDATE.
+    # FOR SHARE waits for that to commit, so either the unlock removed these
+    # files already or this check sees the game unlocked and removes them.
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT locked_at FROM games WHERE id = %s FOR SHARE", (game_id,))
+        game = cursor.fetchone()
+    if not game or not game["locked_at"]:
+        snapshot_store.remove(game_id)
+    return bootstrap.game
+
+
+def rebuild_missing_snapshots():
+    """Recreate snapshots of locked games lost with the disk, e.g. after a deploy."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM games WHERE locked_at IS NOT NULL")
+        game_ids = [row["id"] for row in cursor.fetchall()]
+
+    for game_id in game_ids:
+        if not snapshot_store.has(game_id):
+            try:
+                publish_snapshot(game_id)
+            except Exception:
+                logger.exception("Could not rebuild snapshot for game %s", game_id)
+
+
+@app.post("/api/games/{game_id}/lock", response_model=GameResponse)
+async def lock_game(game_id: str, x_organizer_token: Optional[str] = Header(None)):
+    """Freeze a game's roster and availability and serve its reads from a snapshot."""
+    # Land saves accepted before the lock while they can still be written: once
+    # the lock commits, the upsert skips the game and their waiters get a 409
+    await availability_buffer.flush(game_id)
+    await run_in_threadpool(set_game_lock, game_id, x_organizer_token, True)
+    return await run_in_threadpool(publish_snapshot, game_id)
+
+
+@app.delete("/api/games/{game_id}/lock", response_model=GameResponse)
+def unlock_game(game_id: str, x_organizer_token: Optional[str] = Header(None)):
+    set_game_lock(game_id, x_organizer_token, False)
+    with get_db() as conn:
+        return fetch_game(conn.cursor(), game_id)
 
 
 @app.post("/api/games/{game_id}/verify-pin")
@@ -288,6 +520,98 @@ def verify_organizer_pin(game_id: str, auth: OrganizerAuth):
         return {"verified": True}
 
 
+# ============ GAME SERIES ============
+
+@app.post("/api/game-series", response_model=GameSeriesResponse)
+def create_game_series(series: GameSeriesCreate, x_organizer_token: Optional[str] = Header(None)):
+    """Create a recurring set of games from one template in a single transaction."""
+    game = series.template
+    try:
+        first_date = date.fromisoformat(game.game_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid game date")
+
+    step = timedelta(days=RECURRENCE_INTERVAL_DAYS[series.recurrence.frequency])
+    series_id = generate_game_id()
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+
+        organizer_id = None
+        organizer_name = None
+        if x_organizer_token:
+            cursor.execute("SELECT id, name FROM organizers WHERE id = %s", (x_organizer_token,))
+            org = cursor.fetchone()
+            if org:
+                organizer_id = org["id"]
+                organizer_name = org["name"]
+
+        if series.copy_roster_from:
+            cursor.execute("""
+                SELECT g.id, (SELECT COUNT(*) FROM players WHERE game_id = g.id) as player_count
+                FROM games g WHERE g.id = %s
+            """, (series.copy_roster_from,))
+            source = cursor.fetchone()
+            if not source:
+                raise HTTPException(status_code=404, detail="Game to copy roster from not found")
+            # Every copy must respect the same cap add_player enforces
+            if source["player_count"] > game.max_players:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Roster has {source['player_count']} players but the series allows {game.max_players}"
+                )
+
+        rows = execute_values(cursor, """
+            INSERT INTO games (id, organizer_id, title, venue, game_date, start_time, end_time, max_players, min_players, selected_days, organizer_pin, series_id)
+            VALUES %s
+            RETURNING *
+        """, [
+            (generate_game_id(), organizer_id, game.title, game.venue, first_date + step * i, game.start_time, game.end_time,
+             game.max_players, game.min_players, Json(game.selected_days), game.organizer_pin, series_id)
+            for i in range(series.recurrence.count)
+        ], fetch=True)
+
+        if series.copy_roster_from:
+            cursor.execute("""
+                INSERT INTO players (game_id, name, avatar_url)
+                SELECT g.id, p.name, p.avatar_url
+                FROM players p
+                CROSS JOIN unnest(%s::text[]) AS g(id)
+                WHERE p.game_id = %s
+            """, ([row["id"] for row in rows], series.copy_roster_from))
+
+        games = []
+        for row in sorted(rows, key=lambda r: r["game_date"]):
+            data = dict(row)
+            data.pop('organizer_pin', None)
+            data['organizer_name'] = organizer_name
+            games.append(GameResponse(**data))
+        return GameSeriesResponse(series_id=series_id, games=games)
+
+
+@app.get("/api/game-series/{series_id}", response_model=list[GameResponse])
+def get_game_series(series_id: str):
+    with get_read_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT g.*, o.name as organizer_name
+            FROM games g
+            LEFT JOIN organizers o ON g.organizer_id = o.id
+            WHERE g.series_id = %s
+            ORDER BY g.game_date
+        """, (series_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            raise HTTPException(status_code=404, detail="Series not found")
+
+        results = []
+        for row in rows:
+            data = dict(row)
+            data.pop('organizer_pin', None)
+            results.append(GameResponse(**data))
+        return results
+
+
 # ============ PLAYERS ============
 
 @app.post("/api/games/{game_id}/players", response_model=PlayerResponse)
@@ -295,41 +619,78 @@ def add_player(game_id: str, player: PlayerCreate, x_organizer_token: Optional[s
     with get_db() as conn:
         cursor = conn.cursor()
 
-        cursor.execute("SELECT id, organizer_id FROM games WHERE id = %s", (game_id,))
+        # Serialize joins per game so the max_players check in join_game sees every
+        # earlier join. NO KEY UPDATE does not block availability writes,
+        # whose foreign key check only takes KEY SHARE on the game row.
+        cursor.execute("SELECT id, organizer_id, max_players, locked_at FROM games WHERE id = %s FOR NO KEY UPDATE", (game_id,))
         game = cursor.fetchone()
         if not game:
             raise HTTPException(status_code=404, detail="Game not found")
-
-        cursor.execute("SELECT * FROM players WHERE game_id = %s AND name = %s", (game_id, player.name))
-        existing = cursor.fetchone()
-        if existing:
-            return PlayerResponse(**dict(existing))
-
-        cursor.execute(
-            "INSERT INTO players (game_id, name, avatar_url) VALUES (%s, %s, %s) RETURNING *",
-            (game_id, player.name, player.avatar_url)
+        ensure_unlocked(game)
+
+        joined = join_game(cursor, game, player)
+        if not joined:
+            raise HTTPException(status_code=409, detail="Game is full")
+        result, created = joined
+
+    if created and game["organizer_id"]:
+        player_history_index.record(str(game["organizer_id"]), player.name)
+    return result
+
+
+def join_game(cursor, game, player: PlayerCreate) -> Optional[tuple[PlayerResponse, bool]]:
+    """Add a player, returning (player, created), or None if the game is full.
+
+    The caller must hold the game row FOR NO KEY UPDATE.
+    """
+    # Insert unless full or taken, record history for new players, and
+    # fall back to the existing player with the same name
+    cursor.execute("""
+        WITH inserted AS (
+            INSERT INTO players (game_id, name, avatar_url)
+            SELECT %(game_id)s, %(name)s, %(avatar_url)s
+            WHERE (SELECT COUNT(*) FROM players WHERE game_id = %(game_id)s) < %(max_players)s
+            ON CONFLICT (game_id, name) DO NOTHING
+            RETURNING *
+        ),
+        history AS (
+            INSERT INTO player_history (organizer_id, player_name, last_used)
+            SELECT %(organizer_id)s, name, CURRENT_TIMESTAMP FROM inserted
+            WHERE %(organizer_id)s IS NOT NULL
+            ON CONFLICT (organizer_id, player_name)
+            DO UPDATE SET last_used = CURRENT_TIMESTAMP
         )
-        row = cursor.fetchone()
-
-        # Record to player history for the game's organizer
-        if game["organizer_id"]:
-            cursor.execute("""
-                INSERT INTO player_history (organizer_id, player_name, last_used)
-                VALUES (%s, %s, CURRENT_TIMESTAMP)
-                ON CONFLICT (organizer_id, player_name)
-                DO UPDATE SET last_used = CURRENT_TIMESTAMP
-            """, (game["organizer_id"], player.name))
-
-        return PlayerResponse(**dict(row))
+        SELECT *, true as created FROM inserted
+        UNION ALL
+        SELECT p.*, false as created FROM players p
+        WHERE p.game_id = %(game_id)s AND p.name = %(name)s
+          AND NOT EXISTS (SELECT 1 FROM inserted)
+    """, {
+        "game_id": game["id"],
+        "name": player.name,
+        "avatar_url": player.avatar_url,
+        "max_players": game["max_players"] or MAX_PLAYERS_DEFAULT,
+        "organizer_id": game["organizer_id"],
+    })
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    data = dict(row)
+    created = data.pop("created")
+    return PlayerResponse(**data), created
+
+
+def fetch_players(cursor, game_id: str) -> list[PlayerResponse]:
+    cursor.execute("SELECT * FROM players WHERE game_id = %s ORDER BY created_at", (game_id,))
+    rows = cursor.fetchall()
+    return [PlayerResponse(**dict(row)) for row in rows]
 
 
 @app.get("/api/games/{game_id}/players", response_model=list[PlayerResponse])
-def get_players(game_id: str):
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM players WHERE game_id = %s ORDER BY created_at", (game_id,))
-        rows = cursor.fetchall()
-        return [PlayerResponse(**dict(row)) for row in rows]
+async def get_players(request: Request, game_id: str):
+    return (await run_in_threadpool(snapshot_store.response, request, game_id, "players")
+            or await coalesced_read("players", game_id, fetch_players))
 
 
 @app.put("/api/games/{game_id}/players/{player_id}", response_model=PlayerResponse)
@@ -338,7 +699,7 @@ def update_player(game_id: str, player_id: int, player: PlayerCreate, x_organize
         cursor = conn.cursor()
 
         # Verify game exists and check organizer auth
-        cursor.execute("SELECT organizer_id FROM games WHERE id = %s", (game_id,))
+        cursor.execute("SELECT organizer_id, locked_at FROM games WHERE id = %s FOR KEY SHARE", (game_id,))
         game = cursor.fetchone()
         if not game:
             raise HTTPException(status_code=404, detail="Game not found")
@@ -346,6 +707,7 @@ def update_player(game_id: str, player_id: int, player: PlayerCreate, x_organize
         is_organizer = x_organizer_token and game["organizer_id"] == x_organizer_token
         if not is_organizer:
             raise HTTPException(status_code=403, detail="Only the organizer can edit players")
+        ensure_unlocked(game)
 
         cursor.execute("SELECT * FROM players WHERE id = %s AND game_id = %s", (player_id, game_id))
         if not cursor.fetchone():
@@ -359,7 +721,7 @@ def update_player(game_id: str, player_id: int, player: PlayerCreate, x_organize
             raise HTTPException(status_code=409, detail="Name already taken")
 
         cursor.execute(
-            "UPDATE players SET name = %s, avatar_url = %s WHERE id = %s RETURNING *",
+            "UPDATE players SET name = %s, avatar_url = %s, updated_at = CURRENT_TIMESTAMP, change_xid = pg_current_xact_id() WHERE id = %s RETURNING *",
             (player.name, player.avatar_url, player_id)
         )
         row = cursor.fetchone()
@@ -372,7 +734,7 @@ def delete_player(game_id: str, player_id: int, x_organizer_token: Optional[str]
         cursor = conn.cursor()
 
         # Verify game exists and check organizer auth
-        cursor.execute("SELECT organizer_id FROM games WHERE id = %s", (game_id,))
+        cursor.execute("SELECT organizer_id, locked_at FROM games WHERE id = %s FOR KEY SHARE", (game_id,))
         game = cursor.fetchone()
         if not game:
             raise HTTPException(status_code=404, detail="Game not found")
@@ -380,10 +742,17 @@ def delete_player(game_id: str, player_id: int, x_organizer_token: Optional[str]
         is_organizer = x_organizer_token and game["organizer_id"] == x_organizer_token
         if not is_organizer:
             raise HTTPException(status_code=403, detail="Only the organizer can delete players")
+        ensure_unlocked(game)
 
         cursor.execute("DELETE FROM players WHERE id = %s AND game_id = %s", (player_id, game_id))
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Player not found")
+
+        cursor.execute("""
+            INSERT INTO player_tombstones (game_id, player_id) VALUES (%s, %s)
+            ON CONFLICT (game_id, player_id)
+            DO UPDATE SET deleted_at = CURRENT_TIMESTAMP, change_xid = pg_current_xact_id()
+        """, (game_id, player_id))
         return {"message": "Player deleted"}
 
 
@@ -398,7 +767,7 @@ def update_player_availability(
     with get_db() as conn:
         cursor = conn.cursor()
 
-        cursor.execute("SELECT organizer_id FROM games WHERE id = %s", (game_id,))
+        cursor.execute("SELECT organizer_id, locked_at FROM games WHERE id = %s FOR KEY SHARE", (game_id,))
         game = cursor.fetchone()
         if not game:
             raise HTTPException(status_code=404, detail="Game not found")
@@ -406,110 +775,398 @@ def update_player_availability(
         is_organizer = x_organizer_token and game["organizer_id"] == x_organizer_token
         if not is_organizer:
             raise HTTPException(status_code=403, detail="Only the organizer can edit player availability")
+        ensure_unlocked(game)
 
         cursor.execute("SELECT id FROM players WHERE id = %s AND game_id = %s", (player_id, game_id))
         if not cursor.fetchone():
             raise HTTPException(status_code=404, detail="Player not found")
 
-        for time_slot, status in availability.slots.items():
-            cursor.execute("""
-                INSERT INTO availability (game_id, player_id, day, time_slot, status)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT(game_id, player_id, day, time_slot)
-                DO UPDATE SET status = EXCLUDED.status, updated_at = CURRENT_TIMESTAMP
-            """, (game_id, player_id, availability.day, time_slot, status))
+        if availability.slots:
+            upsert_availability(cursor, game_id, [
+                (player_id, availability.day, time_slot, status)
+                for time_slot, status in availability.slots.items()
+            ])
 
         return {"message": "Availability updated"}
 
 
 # ============ AVAILABILITY ============
 
-@app.post("/api/games/{game_id}/availability")
-def submit_availability(game_id: str, availability: AvailabilityBulkCreate):
+def check_game_and_player(game_id: str, player_id: int):
     with get_db() as conn:
         cursor = conn.cursor()
-
-        cursor.execute("SELECT id FROM games WHERE id = %s", (game_id,))
-        if not cursor.fetchone():
+        cursor.execute("""
+            SELECT
+                (SELECT id FROM games WHERE id = %(game_id)s) as game_id,
+                (SELECT locked_at FROM games WHERE id = %(game_id)s) as locked_at,
+                (SELECT id FROM players WHERE id = %(player_id)s) as player_id
+        """, {"game_id": game_id, "player_id": player_id})
+        row = cursor.fetchone()
+        if not row["game_id"]:
             raise HTTPException(status_code=404, detail="Game not found")
-
-        cursor.execute("SELECT id FROM players WHERE id = %s", (availability.player_id,))
-        if not cursor.fetchone():
+        ensure_unlocked(row)
+        if not row["player_id"]:
             raise HTTPException(status_code=404, detail="Player not found")
 
-        for time_slot, status in availability.slots.items():
-            cursor.execute("""
-                INSERT INTO availability (game_id, player_id, day, time_slot, status)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT(game_id, player_id, day, time_slot)
-                DO UPDATE SET status = EXCLUDED.status, updated_at = CURRENT_TIMESTAMP
-            """, (game_id, availability.player_id, availability.day, time_slot, status))
 
-        return {"message": "Availability saved"}
+@app.post("/api/games/{game_id}/availability")
+async def submit_availability(game_id: str, availability: AvailabilityBulkCreate):
+    await run_in_threadpool(check_game_and_player, game_id, availability.player_id)
+
+    if availability.slots:
+        await availability_buffer.submit(game_id, availability.player_id, availability.day, availability.slots)
+
+    return {"message": "Availability saved"}
+
+
+def fetch_availability(cursor, game_id: str) -> list[AvailabilityResponse]:
+    cursor.execute("""
+        SELECT a.*, p.name as player_name
+        FROM availability a
+        JOIN players p ON a.player_id = p.id
+        WHERE a.game_id = %s
+        ORDER BY a.day, a.time_slot, p.name
+    """, (game_id,))
+    rows = cursor.fetchall()
+    return [AvailabilityResponse(**dict(row)) for row in rows]
+
+
+def fetch_availability_delta(cursor, game_id: str, since: int) -> AvailabilityDeltaResponse:
+    # The cursor is the oldest transaction still running when this read
+    # starts. Anything that commits later has an id at or above it, so the
+    # next read (change_xid >= cursor) cannot miss it, however long the
+    # writer ran. Rows already seen may be resent; clients apply changes by
+    # (player_id, day, time_slot), so repeats are harmless.
+    cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text as cursor")
+    next_cursor = cursor.fetchone()["cursor"]
+
+    # A renamed player's rows are resent so clients pick up the new name
+    cursor.execute("""
+        SELECT a.*, p.name as player_name
+        FROM availability a
+        JOIN players p ON a.player_id = p.id
+        WHERE a.game_id = %(game_id)s
+          AND (a.change_xid >= %(since)s::xid8 OR p.change_xid >= %(since)s::xid8)
+        ORDER BY a.day, a.time_slot, p.name
+    """, {"game_id": game_id, "since": str(since)})
+    changes = [AvailabilityResponse(**dict(row)) for row in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT player_id FROM player_tombstones
+        WHERE game_id = %s AND change_xid >= %s::xid8
+    """, (game_id, str(since)))
+    deleted = [row["player_id"] for row in cursor.fetchall()]
+
+    return AvailabilityDeltaResponse(cursor=next_cursor, changes=changes, deleted_player_ids=deleted)
+
+
+@app.get("/api/games/{game_id}/availability",
+         response_model=Union[list[AvailabilityResponse], AvailabilityDeltaResponse])
+def get_availability(request: Request, game_id: str, since: Optional[str] = None):
+    """Full availability list, or with ?since=<cursor> only what changed since then.
+
+    Pass since=0 for the first delta call to get every row plus a cursor.
+    """
+    if since is None:
+        snapshot = snapshot_store.response(request, game_id, "availability")
+        if snapshot:
+            return snapshot
+        with get_read_db() as conn:
+            return fetch_availability(conn.cursor(), game_id)
+
+    if not since.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # The cursor comes from the primary's transaction ids, so read from the
+    # primary: a lagging replica could return a cursor past rows it has not
+    # replayed yet
+    with get_db() as conn:
+        return fetch_availability_delta(conn.cursor(), game_id, int(since))
+
+
+def fetch_heatmap(cursor, game_id: str) -> list[HeatmapResponse]:
+    cursor.execute("""
+        SELECT
+            a.day,
+            a.time_slot,
+            COUNT(CASE WHEN a.status = 'available' THEN 1 END) as available_count,
+            COUNT(*) as total_count,
+            STRING_AGG(CASE WHEN a.status = 'available' THEN p.name END, ',') as available_players
+        FROM availability a
+        JOIN players p ON a.player_id = p.id
+        WHERE a.game_id = %s
+        GROUP BY a.day, a.time_slot
+        ORDER BY a.day, a.time_slot
+    """, (game_id,))
+
+    rows = cursor.fetchall()
+
+    heatmap = {}
+    for row in rows:
+        day = row["day"]
+        if day not in heatmap:
+            heatmap[day] = []
+
+        available_players = row["available_players"].split(",") if row["available_players"] else []
+        heatmap[day].append(HeatmapSlot(
+            time_slot=row["time_slot"],
+            available_count=row["available_count"],
+            total_count=row["total_count"],
+            available_players=available_players
+        ))
+
+    return [HeatmapResponse(day=day, slots=slots) for day, slots in heatmap.items()]
 
 
-@app.get("/api/games/{game_id}/availability", response_model=list[AvailabilityResponse])
-def get_availability(game_id: str):
-    with get_db() as conn:
+@app.get("/api/games/{game_id}/heatmap", response_model=list[HeatmapResponse])
+async def get_heatmap(request: Request, game_id: str):
+    return (await run_in_threadpool(snapshot_store.response, request, game_id, "heatmap")
+            or await coalesced_read("heatmap", game_id, fetch_heatmap))
+
+
+def fetch_game_version(cursor, game_id: str) -> str:
+    """Hash of what the heatmap image shows: the game fields it draws and the
+    availability rows behind its counts.
+
+    Derived from the data rather than from updated_at, which is a transaction's
+    start time: a write that started earlier but committed later would not
+    move a MAX(updated_at), and the stale image would keep being served.
+    """
+    cursor.execute("""
+        SELECT
+            g.title, g.selected_days, g.min_players,
+            (SELECT md5(COALESCE(string_agg(
+                        a.player_id || ' ' || a.day || ' ' || a.time_slot || ' ' || a.status, ','
+                        ORDER BY a.player_id, a.day, a.time_slot), ''))
+             FROM availability a WHERE a.game_id = g.id) as availability_hash
+        FROM games g
+        WHERE g.id = %s
+    """, (game_id,))
+    row = cursor.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return hashlib.sha256(repr(tuple(row.values())).encode()).hexdigest()[:16]
+
+
+heatmap_images = RenderCache()
+
+HEATMAP_RENDERERS = {
+    "svg": (render_svg, "image/svg+xml"),
+    "png": (render_png, "image/png"),
+}
+
+
+def serve_heatmap_image(request: Request, game_id: str, fmt: str):
+    """Rendered heatmap for link previews, re-rendered only when the game changes."""
+    render, media_type = HEATMAP_RENDERERS[fmt]
+    with get_read_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT a.*, p.name as player_name
-            FROM availability a
-            JOIN players p ON a.player_id = p.id
-            WHERE a.game_id = %s
-            ORDER BY a.day, a.time_slot, p.name
-        """, (game_id,))
-        rows = cursor.fetchall()
-        return [AvailabilityResponse(**dict(row)) for row in rows]
+        version = fetch_game_version(cursor, game_id)
+        etag = f'"{version}-{fmt}"'
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
 
+        body = heatmap_images.get(game_id, fmt, version)
+        if body is None:
+            # Crawlers unfurling a new link arrive together; render once per version
+            body = read_flights.do(
+                ("heatmap_image", game_id, fmt, version),
+                lambda: render(fetch_game(cursor, game_id), fetch_heatmap(cursor, game_id)),
+            )
+            heatmap_images.put(game_id, fmt, version, body)
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@app.get("/api/games/{game_id}/heatmap.svg")
+def get_heatmap_svg(request: Request, game_id: str):
+    return serve_heatmap_image(request, game_id, "svg")
+
+
+@app.get("/api/games/{game_id}/heatmap.png")
+def get_heatmap_png(request: Request, game_id: str):
+    return serve_heatmap_image(request, game_id, "png")
+
+
+# ============ MUTATIONS ============
+
+def mutation_fingerprint(mutation) -> str:
+    return hashlib.sha256(mutation.model_dump_json().encode()).hexdigest()[:16]
+
+
+def error_body(status_code: int, message: str) -> dict:
+    return {"error": True, "status_code": status_code, "message": message}
+
+
+def apply_mutation(cursor, game, roster: dict, mutation, player_id: Optional[int], is_organizer: bool,
+                   availability_rows: dict) -> dict:
+    """Apply one mutation against the in-transaction roster, returning its result body.
+
+    Availability is collected into availability_rows and written once per batch.
+    """
+    if isinstance(mutation, JoinMutation):
+        existing = next((p for p in roster.values() if p.name == mutation.name), None)
+        if existing:
+            return jsonable_encoder(existing)
+        joined = join_game(cursor, game, mutation)
+        if not joined:
+            raise HTTPException(status_code=409, detail="Game is full")
+        player, _ = joined
+        roster[player.id] = player
+        return jsonable_encoder(player)
+
+    if isinstance(mutation, RenameMutation):
+        if not is_organizer:
+            raise HTTPException(status_code=403, detail="Only the organizer can edit players")
+        if mutation.player_id not in roster:
+            raise HTTPException(status_code=404, detail="Player not found")
+        if any(p.name == mutation.name and p.id != mutation.player_id for p in roster.values()):
+            raise HTTPException(status_code=409, detail="Name already taken")
+        cursor.execute(
+            "UPDATE players SET name = %s, avatar_url = %s, updated_at = CURRENT_TIMESTAMP, change_xid = pg_current_xact_id() WHERE id = %s RETURNING *",
+            (mutation.name, mutation.avatar_url, mutation.player_id)
+        )
+        player = roster[mutation.player_id] = PlayerResponse(**dict(cursor.fetchone()))
+        return jsonable_encoder(player)
+
+    if player_id not in roster:
+        raise HTTPException(status_code=404, detail="Player not found")
+    for time_slot, status in mutation.slots.items():
+        availability_rows[(player_id, mutation.day, time_slot)] = status
+    return {"message": "Availability saved"}
+
+
+@app.post("/api/games/{game_id}/mutations", response_model=MutationBatchResponse)
+def apply_mutations(game_id: str, batch: MutationBatch, x_organizer_token: Optional[str] = Header(None)):
+    """Apply an ordered batch of joins, renames and availability saves in one transaction.
+
+    Each mutation's outcome is recorded under its idempotency key. A retried
+    batch gets the recorded results back and only keys not seen before are
+    applied, so a request that timed out on the client can be resent as is.
+    Results are kept for MUTATION_RESULT_TTL_HOURS (24 by default); a key
+    resent after that is applied again.
+    """
+    fingerprints = {m.idempotency_key: mutation_fingerprint(m) for m in batch.mutations}
+    results = []
 
-@app.get("/api/games/{game_id}/heatmap", response_model=list[HeatmapResponse])
-def get_heatmap(game_id: str):
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT
-                a.day,
-                a.time_slot,
-                COUNT(CASE WHEN a.status = 'available' THEN 1 END) as available_count,
-                COUNT(*) as total_count,
-                STRING_AGG(CASE WHEN a.status = 'available' THEN p.name END, ',') as available_players
-            FROM availability a
-            JOIN players p ON a.player_id = p.id
-            WHERE a.game_id = %s
-            GROUP BY a.day, a.time_slot
-            ORDER BY a.day, a.time_slot
-        """, (game_id,))
 
-        rows = cursor.fetchall()
+        # Joins take add_player's lock, which serializes them and makes a retry
+        # racing the original wait for its results instead of joining twice.
+        # Renames and availability saves only need KEY SHARE, like every write
+        # checked by ensure_unlocked: applying either twice leaves the same
+        # rows, and the second result insert is dropped on conflict.
+        lock = "NO KEY UPDATE" if any(isinstance(m, JoinMutation) for m in batch.mutations) else "KEY SHARE"
+        cursor.execute(f"SELECT id, organizer_id, max_players, locked_at FROM games WHERE id = %s FOR {lock}", (game_id,))
+        game = cursor.fetchone()
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
 
-        heatmap = {}
-        for row in rows:
-            day = row["day"]
-            if day not in heatmap:
-                heatmap[day] = []
+        cursor.execute("""
+            SELECT idempotency_key, fingerprint, status_code, body FROM mutation_results
+            WHERE game_id = %s AND idempotency_key = ANY(%s)
+        """, (game_id, list(fingerprints)))
+        recorded = {row["idempotency_key"]: row for row in cursor.fetchall()}
 
-            available_players = row["available_players"].split(",") if row["available_players"] else []
-            heatmap[day].append(HeatmapSlot(
-                time_slot=row["time_slot"],
-                available_count=row["available_count"],
-                total_count=row["total_count"],
-                available_players=available_players
-            ))
+        roster = {}
+        if len(recorded) < len(fingerprints):
+            ensure_unlocked(game)
+            roster = {p.id: p for p in fetch_players(cursor, game_id)}
+        existing_ids = set(roster)
 
-        return [HeatmapResponse(day=day, slots=slots) for day, slots in heatmap.items()]
+        is_organizer = x_organizer_token and game["organizer_id"] == x_organizer_token
+        availability_rows = {}
+        new_results = []
+        last_joined = None
+
+        for mutation in batch.mutations:
+            key = mutation.idempotency_key
+            record = recorded.get(key)
+            if record:
+                if record["fingerprint"] != fingerprints[key]:
+                    result = MutationResult(idempotency_key=key, status_code=422, body=error_body(
+                        422, "Idempotency key was already used for a different mutation"))
+                else:
+                    result = MutationResult(idempotency_key=key, status_code=record["status_code"],
+                                            body=record["body"], replayed=True)
+            else:
+                player_id = getattr(mutation, "player_id", None) or last_joined
+                try:
+                    body = apply_mutation(cursor, game, roster, mutation, player_id, is_organizer, availability_rows)
+                    result = MutationResult(idempotency_key=key, status_code=200, body=body)
+                except HTTPException as exc:
+                    result = MutationResult(idempotency_key=key, status_code=exc.status_code,
+                                            body=error_body(exc.status_code, exc.detail))
+                new_results.append(result)
+
+            if isinstance(mutation, JoinMutation) and result.status_code == 200:
+                last_joined = result.body["id"]
+            results.append(result)
+
+        if availability_rows:
+            upsert_availability(cursor, game_id, [
+                (player_id, day, time_slot, status)
+                for (player_id, day, time_slot), status in availability_rows.items()
+            ])
+
+        if new_results:
+            execute_values(cursor, """
+                INSERT INTO mutation_results (game_id, idempotency_key, fingerprint, status_code, body)
+                VALUES %s
+                ON CONFLICT (game_id, idempotency_key) DO NOTHING
+            """, [(game_id, r.idempotency_key, fingerprints[r.idempotency_key], r.status_code, Json(r.body))
+                  for r in new_results])
+
+    if game["organizer_id"]:
+        for player_id, player in roster.items():
+            if player_id not in existing_ids:
+                player_history_index.record(str(game["organizer_id"]), player.name)
+    return MutationBatchResponse(results=results)
 
 
 # ============ CONFIGURATION ============
 
-@app.get("/api/config")
-def get_config():
+def build_config(player_roster: list[str] = PLAYER_ROSTER) -> dict:
     return {
         "venues": VENUES,
         "time_slots": TIME_SLOTS,
         "days": DAYS,
         "max_players": {"default": MAX_PLAYERS_DEFAULT, "min": MAX_PLAYERS_MIN, "max": MAX_PLAYERS_MAX},
-        "player_roster": PLAYER_ROSTER
+        "player_roster": player_roster
+    }
+
+
+def encode_config(config: dict) -> tuple[bytes, str]:
+    """Serialize a config once, returning (bytes, ETag)."""
+    body = json.dumps(config, separators=(",", ":")).encode()
+    return body, content_etag(body)
+
+
+# Config only changes on deploy, so it is encoded once at import time.
+# A per-organizer roster override would be encoded the same way and cached by organizer.
+CONFIG_BODY, CONFIG_ETAG = encode_config(build_config())
+CONFIG_SCRIPT = "<script>window.appConfig = " + CONFIG_BODY.decode().replace("</", "<\\/") + ";</script>"
+
+
+@app.get("/api/config")
+def get_config(request: Request):
+    return cached_response(request, CONFIG_BODY, CONFIG_ETAG, "application/json", "public, max-age=3600")
+
+
+# ============ METRICS ============
+
+@app.get("/api/metrics")
+def get_metrics():
+    return {
+        "admission": admission.stats(),
+        "availability_buffer": availability_buffer.stats(),
+        "player_history_index": player_history_index.stats(),
+        "replicas": replica_router.stats(),
+        "heatmap_images": heatmap_images.stats(),
+        "read_coalescing": read_flights.stats(),
+        "snapshots": snapshot_store.stats(),
     }
 
 
@@ -522,24 +1179,36 @@ def health_check():
 
 # ============ STATIC FILES ============
 
+def serve_asset(request: Request, path: str):
+    response = static_assets.response(request, path)
+    if not response:
+        raise HTTPException(status_code=404, detail="Not found")
+    return response
+
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"])
+def serve_static(request: Request, path: str):
+    return serve_asset(request, path)
+
+
 @app.get("/")
-def serve_landing():
-    return FileResponse(STATIC_DIR / "landing.html")
+def serve_landing(request: Request):
+    return serve_asset(request, "landing.html")
 
 
 @app.get("/landing.html")
-def serve_landing_html():
-    return FileResponse(STATIC_DIR / "landing.html")
+def serve_landing_html(request: Request):
+    return serve_asset(request, "landing.html")
 
 
 @app.get("/playeravail.html")
-def serve_playeravail():
-    return FileResponse(STATIC_DIR / "playeravail.html")
+def serve_playeravail(request: Request):
+    return serve_asset(request, "playeravail.html")
 
 
 @app.get("/playermode.html")
-def serve_playermode():
-    return FileResponse(STATIC_DIR / "playermode.html")
+def serve_playermode(request: Request):
+    return serve_asset(request, "playermode.html")
 
 
 if __name__ == "__main__":
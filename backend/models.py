@@ -1,11 +1,21 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel, BeforeValidator, Field, field_validator
+from typing import Annotated, Literal, Optional, Union
 from constants import (
     GAME_TITLE_DEFAULT, GAME_TITLE_MAX_LENGTH,
-    PLAYER_NAME_MAX_LENGTH, MAX_PLAYERS_MIN, MAX_PLAYERS_MAX, MAX_PLAYERS_DEFAULT
+    PLAYER_NAME_MAX_LENGTH, MAX_PLAYERS_MIN, MAX_PLAYERS_MAX, MAX_PLAYERS_DEFAULT,
+    SERIES_MAX_GAMES, MUTATION_BATCH_MAX, IDEMPOTENCY_KEY_MAX_LENGTH
 )
 
 
+def iso_string(value):
+    # psycopg2 returns DATE/TIMESTAMP columns as date/datetime; responses send them as ISO strings
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+IsoString = Annotated[str, BeforeValidator(iso_string)]
+
+
 class GameCreate(BaseModel):
     title: str = Field(default=GAME_TITLE_DEFAULT, max_length=GAME_TITLE_MAX_LENGTH)
     venue: str = Field(..., min_length=1, max_length=50)
@@ -39,7 +49,7 @@ class GameResponse(BaseModel):
     id: str
     title: str
     venue: str
-    game_date: str
+    game_date: IsoString
     start_time: str
     end_time: str
     max_players: int
@@ -47,7 +57,25 @@ class GameResponse(BaseModel):
     selected_days: Optional[list[str]] = ["saturday", "sunday"]
     organizer_id: Optional[str] = None
     organizer_name: Optional[str] = None
-    created_at: str
+    series_id: Optional[str] = None
+    locked_at: Optional[datetime] = None
+    created_at: IsoString
+
+
+class RecurrenceRule(BaseModel):
+    frequency: str = Field(default="weekly", pattern=r"^(daily|weekly|biweekly)$")
+    count: int = Field(..., ge=1, le=SERIES_MAX_GAMES)
+
+
+class GameSeriesCreate(BaseModel):
+    template: GameCreate
+    recurrence: RecurrenceRule
+    copy_roster_from: Optional[str] = None  # game id whose players join every game
+
+
+class GameSeriesResponse(BaseModel):
+    series_id: str
+    games: list[GameResponse]
 
 
 class PlayerCreate(BaseModel):
@@ -65,7 +93,7 @@ class PlayerResponse(BaseModel):
     game_id: str
     name: str
     avatar_url: Optional[str]
-    created_at: str
+    created_at: IsoString
 
 
 class AvailabilityCreate(BaseModel):
@@ -97,7 +125,58 @@ class AvailabilityResponse(BaseModel):
     day: str
     time_slot: str
     status: str
-    updated_at: str
+    updated_at: IsoString
+
+
+class AvailabilityDeltaResponse(BaseModel):
+    cursor: str
+    changes: list[AvailabilityResponse]
+    deleted_player_ids: list[int]
+
+
+class MutationBase(BaseModel):
+    idempotency_key: str = Field(..., min_length=1, max_length=IDEMPOTENCY_KEY_MAX_LENGTH)
+
+
+class JoinMutation(MutationBase, PlayerCreate):
+    type: Literal["join"]
+
+
+class RenameMutation(MutationBase, PlayerCreate):
+    type: Literal["rename"]
+    player_id: int
+
+
+class AvailabilityMutation(MutationBase, AvailabilityBulkCreate):
+    type: Literal["availability"]
+    # Defaults to the player from the latest join in the same batch
+    player_id: Optional[int] = None
+
+
+Mutation = Annotated[Union[JoinMutation, RenameMutation, AvailabilityMutation], Field(discriminator="type")]
+
+
+class MutationBatch(BaseModel):
+    mutations: list[Mutation] = Field(..., min_length=1, max_length=MUTATION_BATCH_MAX)
+
+    @field_validator('mutations')
+    @classmethod
+    def keys_unique(cls, v):
+        keys = [m.idempotency_key for m in v]
+        if len(set(keys)) != len(keys):
+            raise ValueError("idempotency_key must be unique within a batch")
+        return v
+
+
+class MutationResult(BaseModel):
+    idempotency_key: str
+    status_code: int
+    body: dict
+    replayed: bool = False
+
+
+class MutationBatchResponse(BaseModel):
+    results: list[MutationResult]
 
 
 class HeatmapSlot(BaseModel):
@@ -112,6 +191,35 @@ class HeatmapResponse(BaseModel):
     slots: list[HeatmapSlot]
 
 
+class GameBootstrapResponse(BaseModel):
+    game: GameResponse
+    players: list[PlayerResponse]
+    availability: list[AvailabilityResponse]
+    heatmap: list[HeatmapResponse]
+
+
+class PlayerConflict(BaseModel):
+    player_name: str
+    date: str
+    day: str
+    time_slot: str
+    game_ids: list[str]
+
+
+class CombinedSlot(BaseModel):
+    date: str
+    day: str
+    time_slot: str
+    available_count: int
+    available_players: list[str]
+
+
+class OrganizerConflictsResponse(BaseModel):
+    game_ids: list[str]
+    conflicts: list[PlayerConflict]
+    best_slots: list[CombinedSlot]
+
+
 class OrganizerAuth(BaseModel):
     pin: str = Field(..., min_length=4, max_length=6, pattern=r"^\d{4,6}$")
 
@@ -124,7 +232,7 @@ class OrganizerCreate(BaseModel):
 class OrganizerResponse(BaseModel):
     id: str
     name: str
-    created_at: str
+    created_at: IsoString
 
 
 class OrganizerUpdate(BaseModel):
@@ -0,0 +1,134 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+class OrganizerNames:
+    """Player names for one organizer, searchable by prefix and substring."""
+
+    def __init__(self, max_names: int):
+        self.max_names = max_names
+        self.recency: dict[str, float] = {}  # name -> recency score, higher is newer
+        self.sorted_keys: list[tuple[str, str]] = []  # (lowercased name, name) for prefix bisect
+        self.last_access = time.monotonic()
+        self.loaded_at = 0.0
+
+    def add(self, name: str, score: float):
+        if name not in self.recency:
+            bisect.insort(self.sorted_keys, (name.lower(), name))
+        self.recency[name] = max(score, self.recency.get(name, score))
+        if len(self.recency) > self.max_names:
+            oldest = min(self.recency, key=self.recency.get)
+            del self.recency[oldest]
+            self.sorted_keys.remove((oldest.lower(), oldest))
+
+    def top_score(self) -> float:
+        return max(self.recency.values(), default=0.0)
+
+    def search(self, q: str, limit: int) -> list[str]:
+        """Prefix matches first, then other substring matches, each newest first."""
+        if not q:
+            return sorted(self.recency, key=self.recency.get, reverse=True)[:limit]
+
+        q = q.lower()
+        start = bisect.bisect_left(self.sorted_keys, (q, ""))
+        prefix = []
+        for key, name in self.sorted_keys[start:]:
+            if not key.startswith(q):
+                break
+            prefix.append(name)
+        prefix.sort(key=self.recency.get, reverse=True)
+        if len(prefix) >= limit:
+            return prefix[:limit]
+
+        matched = set(prefix)
+        substring = [name for key, name in self.sorted_keys if q in key and name not in matched]
+        substring.sort(key=self.recency.get, reverse=True)
+        return (prefix + substring)[:limit]
+
+
+class PlayerHistoryIndex:
+    """Per-organizer in-memory index over player_history for autocomplete.
+
+    Organizers are loaded lazily with the loader, capped at max_names each,
+    and evicted least-recently-used once idle or over max_organizers. Names
+    recorded by other worker processes only reach this one through the
+    database, so an organizer older than refresh_seconds is reloaded and
+    merged on its next search.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str, int], list[tuple[str, float]]],
+        max_names: int = 500,
+        max_organizers: int = 1000,
+        idle_seconds: float = 1800,
+        refresh_seconds: float = 60,
+    ):
+        self.loader = loader
+        self.max_names = max_names
+        self.max_organizers = max_organizers
+        self.idle_seconds = idle_seconds
+        self.refresh_seconds = refresh_seconds
+        self._organizers: OrderedDict[str, OrganizerNames] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _get(self, organizer_id: str):
+        entry = self._organizers.get(organizer_id)
+        if entry:
+            self._organizers.move_to_end(organizer_id)
+            entry.last_access = time.monotonic()
+        return entry
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._organizers:
+            organizer_id, entry = next(iter(self._organizers.items()))
+            if len(self._organizers) <= self.max_organizers and entry.last_access >= cutoff:
+                break
+            del self._organizers[organizer_id]
+
+    def _load(self, organizer_id: str) -> OrganizerNames:
+        # Query outside the lock; merge with any names recorded meanwhile
+        rows = self.loader(organizer_id, self.max_names)
+        with self._lock:
+            entry = self._organizers.get(organizer_id)
+            if not entry:
+                entry = OrganizerNames(self.max_names)
+                self._organizers[organizer_id] = entry
+            for name, score in rows:
+                entry.add(name, score)
+            entry.loaded_at = time.monotonic()
+            self.loads += 1
+            self._evict()
+            return entry
+
+    def search(self, organizer_id: str, q: str = "", limit: int = 20) -> list[str]:
+        with self._lock:
+            entry = self._get(organizer_id)
+            if entry and time.monotonic() - entry.loaded_at < self.refresh_seconds:
+                self.hits += 1
+                return entry.search(q, limit)
+        entry = self._load(organizer_id)
+        with self._lock:
+            return entry.search(q, limit)
+
+    def record(self, organizer_id: str, name: str):
+        """Mark a name as just used; ignored if the organizer is not loaded."""
+        with self._lock:
+            entry = self._get(organizer_id)
+            if entry:
+                entry.add(name, max(time.time(), entry.top_score() + 0.001))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "organizers": len(self._organizers),
+                "names": sum(len(e.recency) for e in self._organizers.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+            }
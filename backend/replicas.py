@@ -0,0 +1,98 @@
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# True while handling a request from a client that wrote recently; set by
+# ReadYourWritesMiddleware and read by ReplicaRouter.
+prefer_primary: ContextVar[bool] = ContextVar("prefer_primary", default=False)
+
+STICKY_COOKIE = "vb_rw"
+
+
+class ReplicaRouter:
+    """Round-robin over read replicas, skipping ones that recently failed.
+
+    A replica that fails to connect is marked down for retry_seconds; when no
+    replica is usable, connect() returns None and the caller uses the primary.
+    """
+
+    def __init__(self, configs: list[dict], connect: Callable[[dict], object], retry_seconds: float = 30):
+        self.replicas = [{"config": config, "down_until": 0.0} for config in configs]
+        self._connect = connect
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.failures = 0
+
+    def connect(self) -> Optional[object]:
+        if not self.replicas or prefer_primary.get():
+            self.primary_reads += 1
+            return None
+
+        start = next(self._next)
+        now = time.monotonic()
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if replica["down_until"] > now:
+                continue
+            try:
+                conn = self._connect(replica["config"])
+            except Exception:
+                self.failures += 1
+                replica["down_until"] = now + self.retry_seconds
+                logger.warning("Replica %s unavailable, skipping for %ss",
+                               replica["config"]["host"], self.retry_seconds)
+                continue
+            self.replica_reads += 1
+            return conn
+
+        self.primary_reads += 1
+        return None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": len(self.replicas),
+            "healthy": sum(1 for r in self.replicas if r["down_until"] <= now),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "failures": self.failures,
+        }
+
+
+class ReadYourWritesMiddleware:
+    """Pin a client's reads to the primary for a while after it writes.
+
+    Successful non-GET responses set a short-lived cookie; requests carrying
+    it read from the primary, so a player's own save is never hidden by
+    replica lag.
+    """
+
+    def __init__(self, app, sticky_seconds: int):
+        self.app = app
+        self.cookie = f"{STICKY_COOKIE}=1; Max-Age={sticky_seconds}; Path=/; SameSite=Lax; HttpOnly".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookies = dict(scope["headers"]).get(b"cookie", b"").decode("latin-1")
+        sticky = any(part.strip().startswith(f"{STICKY_COOKIE}=") for part in cookies.split(";"))
+        is_write = scope["method"] not in ("GET", "HEAD", "OPTIONS")
+
+        async def send_with_cookie(message):
+            if is_write and message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", self.cookie)]
+            await send(message)
+
+        token = prefer_primary.set(sticky)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            prefer_primary.reset(token)
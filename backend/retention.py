@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from fastapi.concurrency import run_in_threadpool
+from config import (
+    RETENTION_DAYS, RETENTION_ARCHIVE, RETENTION_BATCH_SIZE, RETENTION_INTERVAL_MINUTES,
+    MUTATION_RESULT_TTL_HOURS,
+)
+from database import get_db
+from snapshots import snapshot_store
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key so only one worker runs retention at a time
+RETENTION_LOCK_KEY = 7412031
+
+# Games per run, so a backlog is worked off over several runs
+MAX_GAMES_PER_RUN = 200
+
+
+def find_expired_games(days: int, limit: int) -> list[str]:
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id FROM games
+            WHERE game_date < CURRENT_DATE - %s * INTERVAL '1 day'
+            ORDER BY game_date
+            LIMIT %s
+        """, (days, limit))
+        return [row["id"] for row in cursor.fetchall()]
+
+
+def archive_game(game_id: str):
+    """Store a JSON snapshot of the game, its players and availability."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO archived_games (id, organizer_id, game_date, data)
+            SELECT g.id, g.organizer_id, g.game_date, jsonb_build_object(
+                'game', to_jsonb(g) - 'organizer_pin',
+                'players', COALESCE((SELECT jsonb_agg(to_jsonb(p)) FROM players p WHERE p.game_id = g.id), '[]'),
+                'availability', COALESCE((SELECT jsonb_agg(to_jsonb(a)) FROM availability a WHERE a.game_id = g.id), '[]')
+            )
+            FROM games g
+            WHERE g.id = %s
+            ON CONFLICT (id) DO NOTHING
+        """, (game_id,))
+
+
+def delete_game_in_chunks(game_id: str, batch_size: int) -> int:
+    """Delete a game's availability in small transactions, then the game itself.
+
+    Each chunk commits on its own and gives up quickly on lock contention, so
+    retention never holds long locks against live traffic.
+    """
+    deleted = 0
+    while True:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SET LOCAL lock_timeout = '2s'")
+            cursor.execute("""
+                DELETE FROM availability
+                WHERE id IN (SELECT id FROM availability WHERE game_id = %s LIMIT %s)
+            """, (game_id, batch_size))
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SET LOCAL lock_timeout = '2s'")
+        cursor.execute("DELETE FROM games WHERE id = %s", (game_id,))
+    return deleted
+
+
+def prune_mutation_results(hours: int, batch_size: int) -> int:
+    """Delete recorded mutation results older than hours, a chunk per transaction."""
+    pruned = 0
+    while True:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SET LOCAL lock_timeout = '2s'")
+            cursor.execute("""
+                DELETE FROM mutation_results
+                WHERE (game_id, idempotency_key) IN (
+                    SELECT game_id, idempotency_key FROM mutation_results
+                    WHERE created_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 hour'
+                    LIMIT %s
+                )
+            """, (hours, batch_size))
+            pruned += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return pruned
+
+
+def run_retention(days: int = RETENTION_DAYS, archive: bool = RETENTION_ARCHIVE,
+                  batch_size: int = RETENTION_BATCH_SIZE,
+                  mutation_ttl_hours: int = MUTATION_RESULT_TTL_HOURS) -> int:
+    """Archive (optionally) and remove games older than the retention window,
+    and prune mutation results older than their TTL.
+
+    Returns the number of games removed.
+    """
+    if days <= 0 and mutation_ttl_hours <= 0:
+        return 0
+
+    with get_db() as lock_conn:
+        # Autocommit so holding the lock does not keep a transaction open
+        lock_conn.autocommit = True
+        cursor = lock_conn.cursor()
+        cursor.execute("SELECT pg_try_advisory_lock(%s) as locked", (RETENTION_LOCK_KEY,))
+        if not cursor.fetchone()["locked"]:
+            return 0
+
+        removed = 0
+        for game_id in (find_expired_games(days, MAX_GAMES_PER_RUN) if days > 0 else []):
+            try:
+                if archive:
+                    archive_game(game_id)
+                rows = delete_game_in_chunks(game_id, batch_size)
+                snapshot_store.remove(game_id)
+                removed += 1
+                logger.info("Retention removed game %s (%d availability rows)", game_id, rows)
+            except Exception:
+                logger.exception("Retention failed for game %s; will retry next run", game_id)
+
+        if mutation_ttl_hours > 0:
+            try:
+                pruned = prune_mutation_results(mutation_ttl_hours, batch_size)
+                if pruned:
+                    logger.info("Retention pruned %d mutation results", pruned)
+            except Exception:
+                logger.exception("Pruning mutation results failed; will retry next run")
+
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (RETENTION_LOCK_KEY,))
+        return removed
+
+
+async def retention_loop():
+    """Background task: run retention every RETENTION_INTERVAL_MINUTES."""
+    while True:
+        try:
+            await run_in_threadpool(run_retention)
+        except Exception:
+            logger.exception("Retention run failed")
+        await asyncio.sleep(RETENTION_INTERVAL_MINUTES * 60)
+
+
+if __name__ == "__main__":
+    print(f"Removed {run_retention()} games")
@@ -0,0 +1,115 @@
+"""Production server entry point.
+
+Runs the app under gunicorn with uvicorn workers:
+- one worker per CPU the container may use, counting its cgroup quota
+  (WEB_CONCURRENCY overrides), and never more workers than
+  DATABASE_MAX_CONNECTIONS allows
+- uvloop event loop and httptools parser
+- app imported once in the master and forked (preload)
+- workers recycled after MAX_REQUESTS requests, with jitter, unless there
+  is only one (recycling it would drop requests while it restarts)
+- SIGTERM drains in-flight requests for up to GRACEFUL_TIMEOUT seconds
+
+Usage:
+    cd backend && python server.py
+
+See docs/plans/2026-10-19-production-server.md for tuning and benchmarks.
+"""
+
+import math
+import os
+from pathlib import Path
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+
+class TunedUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        # Render terminates TLS in front of us; trust its X-Forwarded-* headers
+        "proxy_headers": True,
+        "forwarded_allow_ips": "*",
+    }
+
+
+def cgroup_cpu_limit() -> float:
+    """CPUs allowed by the container's cgroup quota, or inf if unlimited.
+
+    sched_getaffinity reports the host's cores inside a container, so the
+    quota (cgroup v2 cpu.max, or v1 cfs_quota_us/cfs_period_us) is what
+    actually bounds useful workers.
+    """
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return math.inf
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return math.inf
+
+
+def default_workers() -> int:
+    """Workers from WEB_CONCURRENCY, else one per CPU this process may use.
+
+    Capped so every worker can still hold at least one database connection.
+    """
+    max_connections = int(os.getenv("DATABASE_MAX_CONNECTIONS", "90"))
+    if os.getenv("WEB_CONCURRENCY"):
+        workers = int(os.environ["WEB_CONCURRENCY"])
+    else:
+        try:
+            cpus = len(os.sched_getaffinity(0))
+        except AttributeError:
+            cpus = os.cpu_count() or 1
+        quota = cgroup_cpu_limit()
+        workers = cpus if math.isinf(quota) else min(cpus, math.ceil(quota))
+    return max(1, min(workers, max_connections))
+
+
+def server_options(workers: int) -> dict:
+    from config import HOST, PORT
+
+    return {
+        "bind": f"{HOST}:{PORT}",
+        "workers": workers,
+        "worker_class": f"{__name__}.TunedUvicornWorker",
+        "preload_app": True,
+        # A lone worker has no sibling to serve requests while it restarts
+        "max_requests": int(os.getenv("MAX_REQUESTS", "2000" if workers > 1 else "0")),
+        "max_requests_jitter": int(os.getenv("MAX_REQUESTS_JITTER", "200")),
+        "keepalive": int(os.getenv("KEEPALIVE_SECONDS", "75")),
+        "graceful_timeout": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        "timeout": int(os.getenv("WORKER_TIMEOUT", "60")),
+        "accesslog": "-",
+    }
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import app
+        return app
+
+
+if __name__ == "__main__":
+    workers = default_workers()
+    # Read by config, which splits rate limits and the connection budget
+    # between workers; must be set before config is first imported
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    Server(server_options(workers)).run()
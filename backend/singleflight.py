@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class Flight:
+    """One in-flight call; followers wait on it and share its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one.
+
+    Keys are tuples whose first element names the endpoint, so stats are
+    reported per endpoint. Only calls that overlap share a result: once the
+    leader finishes the key is forgotten and the next call runs again, so
+    nothing is cached beyond the lifetime of one query.
+
+    do() is for sync handlers (running in the threadpool), do_async() for
+    async handlers; the two keep separate tables so a sync follower never
+    blocks on the event loop or the other way round.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, Flight] = {}
+        self._async_flights: dict[Hashable, asyncio.Future] = {}
+        self.calls: dict[str, int] = {}
+        self.coalesced: dict[str, int] = {}
+
+    def _count(self, key: Hashable, leader: bool):
+        name = key[0] if isinstance(key, tuple) else str(key)
+        counter = self.calls if leader else self.coalesced
+        counter[name] = counter.get(name, 0) + 1
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+            self._count(key, leader)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Only touched from the event loop thread; the lock guards the counters
+        future = self._async_flights.get(key)
+        if future is not None:
+            with self._lock:
+                self._count(key, leader=False)
+            # shield so a cancelled follower does not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = self._async_flights[key] = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._count(key, leader=True)
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as err:
+            future.set_exception(err)
+            # Mark retrieved so an unobserved error does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._async_flights[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = sorted(set(self.calls) | set(self.coalesced))
+            return {
+                "in_flight": len(self._flights) + len(self._async_flights),
+                "endpoints": {
+                    name: {"queries": self.calls.get(name, 0), "coalesced": self.coalesced.get(name, 0)}
+                    for name in endpoints
+                },
+            }
@@ -0,0 +1,96 @@
+import gzip
+import mmap
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+from static_assets import choose_encoding, etag_matches
+from config import SNAPSHOT_DIR
+
+# One file per read endpoint served from a snapshot
+SECTIONS = ("game", "players", "availability", "heatmap", "bootstrap")
+
+# Game ids are token_urlsafe; anything else never maps to a file
+SAFE_GAME_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Snapshots disappear on unlock, so clients revalidate rather than cache for long
+CACHE_SNAPSHOT = "public, max-age=60"
+
+
+class SnapshotStore:
+    """Gzipped JSON responses for locked games, one directory per game.
+
+    A file's presence is what routes a read here, so every worker on the host
+    sees a lock as soon as the files are written. A missing file just means the
+    read falls back to the database, which returns the same data.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.written = 0
+        self.removed = 0
+
+    def path(self, game_id: str, section: str) -> Optional[Path]:
+        if not SAFE_GAME_ID.match(game_id):
+            return None
+        return self.directory / game_id / f"{section}.json.gz"
+
+    def write(self, game_id: str, sections: dict[str, bytes]):
+        """Write each section's JSON compressed, replacing files atomically."""
+        game_dir = self.directory / game_id
+        game_dir.mkdir(parents=True, exist_ok=True)
+        for section, body in sections.items():
+            target = self.path(game_id, section)
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(gzip.compress(body, 9))
+            os.replace(tmp, target)
+        self.written += 1
+
+    def has(self, game_id: str) -> bool:
+        return all(self.path(game_id, section).exists() for section in SECTIONS)
+
+    def remove(self, game_id: str):
+        path = self.path(game_id, SECTIONS[0])
+        if path and path.parent.exists():
+            shutil.rmtree(path.parent, ignore_errors=True)
+            self.removed += 1
+
+    def response(self, request: Request, game_id: str, section: str) -> Optional[Response]:
+        """Serve a section from its snapshot, or None if the game has none.
+
+        Does blocking file IO; async handlers call it through run_in_threadpool.
+        """
+        path = self.path(game_id, section)
+        if path is None:
+            return None
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        # Read through the open file, so an unlock removing it mid-request is harmless
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            stat = os.fstat(f.fileno())
+            etag = f'"snap-{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            headers = {"ETag": etag, "Cache-Control": CACHE_SNAPSHOT, "Vary": "Accept-Encoding"}
+            self.hits += 1
+            if etag_matches(request.headers.get("if-none-match", ""), etag):
+                return Response(status_code=304, headers=headers)
+
+            if choose_encoding(request.headers.get("accept-encoding", ""), {"gzip": mapped}) == "gzip":
+                headers["Content-Encoding"] = "gzip"
+                body = mapped[:]
+            else:
+                body = gzip.decompress(mapped)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        games = sum(1 for _ in self.directory.iterdir()) if self.directory.exists() else 0
+        return {"games": games, "hits": self.hits, "written": self.written, "removed": self.removed}
+
+
+snapshot_store = SnapshotStore(SNAPSHOT_DIR)
@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Optional
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Matches fingerprinted names such as "landing.3f9a1c2b.html"
+HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{8})(?P<suffix>\.[^.]+)$")
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+
+class StaticAsset:
+    """One file held in memory with its precompressed variants."""
+
+    def __init__(self, name: str, body: bytes):
+        self.body = body
+        self.hash = hashlib.sha256(body).hexdigest()[:8]
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+        self.media_type = media_type
+
+        # Only keep a compressed variant when it is actually smaller
+        self.variants = {"identity": self.body}
+        compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+        if len(compressed) < len(self.body):
+            self.variants["gzip"] = compressed
+        if brotli:
+            compressed = brotli.compress(self.body, quality=11)
+            if len(compressed) < len(self.body):
+                self.variants["br"] = compressed
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.hash}"' if encoding == "identity" else f'"{self.hash}-{encoding}"'
+
+
+class StaticAssets:
+    """Precompressed, content-hashed static files served from memory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.assets: dict[str, StaticAsset] = {}
+
+    def load(self, head_html: str = ""):
+        """Read and compress every file under the directory once.
+
+        head_html is inserted before </head> in every page, e.g. to inline data
+        the page would otherwise fetch on load.
+        """
+        self.assets = {}
+        for path in sorted(self.directory.rglob("*")):
+            if path.is_file():
+                name = path.relative_to(self.directory).as_posix()
+                self.assets[name] = StaticAsset(name, path.read_bytes())
+
+        # Point pages at fingerprinted URLs so the assets they load can be cached forever
+        for name, asset in list(self.assets.items()):
+            if not name.endswith(".html"):
+                continue
+            body = asset.body
+            if head_html:
+                body = body.replace(b"</head>", head_html.encode() + b"\n</head>", 1)
+            for other in self.assets:
+                if not other.endswith(".html"):
+                    body = body.replace(f'"/static/{other}"'.encode(), f'"{self.url(other)}"'.encode())
+            if body != asset.body:
+                self.assets[name] = StaticAsset(name, body)
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL for an asset, safe to cache forever."""
+        asset = self.assets[name]
+        stem, dot, suffix = name.rpartition(".")
+        return f"/static/{stem}.{asset.hash}.{suffix}" if dot else f"/static/{name}.{asset.hash}"
+
+    def resolve(self, path: str) -> tuple[Optional["StaticAsset"], bool]:
+        """Return (asset, is_hashed) for a request path, or (None, False)."""
+        if path in self.assets:
+            return self.assets[path], False
+        match = HASHED_NAME.match(path)
+        if match:
+            asset = self.assets.get(match["stem"] + match["suffix"])
+            if asset and asset.hash == match["hash"]:
+                return asset, True
+        return None, False
+
+    def response(self, request: Request, path: str) -> Optional[Response]:
+        """Build a response for the asset at path, or None if it does not exist."""
+        asset, hashed = self.resolve(path)
+        if not asset:
+            return None
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), asset.variants)
+        etag = asset.etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CACHE_IMMUTABLE if hashed else CACHE_REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+
+def cached_response(request: Request, body: bytes, etag: str, media_type: str, cache_control: str) -> Response:
+    """Serve pre-encoded bytes, answering a matching If-None-Match with 304."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def content_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+def choose_encoding(accept_encoding: str, variants: dict) -> str:
+    """Pick the smallest variant the client accepts (q > 0)."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+
+    candidates = [e for e in ("br", "gzip") if e in variants and (e in accepted or "*" in accepted)]
+    if not candidates:
+        return "identity"
+    return min(candidates, key=lambda e: len(variants[e]))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in tags
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from database import get_db, upsert_availability
+
+logger = logging.getLogger(__name__)
+
+
+class AvailabilityWriteBuffer:
+    """Write-behind buffer that coalesces availability saves per game.
+
+    The first save for a game starts a timer; every save for that game within
+    the window is merged by (player_id, day, time_slot), last write wins, and
+    the result is written as one upsert on one connection. A game's batches
+    are written one after another, so a newer status is never overwritten by
+    an older batch that was slower to commit.
+    """
+
+    def __init__(self, window_ms: int = 50, ack_after_flush: bool = True):
+        self.window = window_ms / 1000
+        self.ack_after_flush = ack_after_flush
+        self._pending: dict[str, dict[tuple, str]] = {}
+        self._waiters: dict[str, list[tuple[asyncio.Future, set]]] = {}
+        self._flushers: dict[str, asyncio.Task] = {}
+        self._writing: dict[str, asyncio.Future] = {}  # game_id -> last batch being written
+        self.updates_received = 0
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    async def submit(self, game_id: str, player_id: int, day: str, slots: dict[str, str]):
+        """Queue slot statuses for a player; waits for the commit when ack_after_flush is set.
+
+        With ack_after_flush, raises 409 if the rows were skipped because the
+        player was deleted or the game locked before they were written.
+        """
+        pending = self._pending.setdefault(game_id, {})
+        for time_slot, status in slots.items():
+            pending[(player_id, day, time_slot)] = status
+        self.updates_received += len(slots)
+
+        waiter = None
+        if self.ack_after_flush:
+            waiter = asyncio.get_running_loop().create_future()
+            keys = {(player_id, day, time_slot) for time_slot in slots}
+            self._waiters.setdefault(game_id, []).append((waiter, keys))
+
+        if game_id not in self._flushers:
+            self._flushers[game_id] = asyncio.create_task(self._flush_after_window(game_id))
+
+        if waiter:
+            await waiter
+
+    async def _flush_after_window(self, game_id: str):
+        await asyncio.sleep(self.window)
+        # drain() may already have flushed this batch and a newer timer taken over
+        if self._flushers.get(game_id) is asyncio.current_task():
+            await self._flush(game_id)
+
+    async def _flush(self, game_id: str):
+        self._flushers.pop(game_id, None)
+        pending = self._pending.pop(game_id, {})
+        waiters = self._waiters.pop(game_id, [])
+        if not pending:
+            return
+
+        # Queue behind the game's previous batch if it is still being written
+        previous = self._writing.get(game_id)
+        done = self._writing[game_id] = asyncio.get_running_loop().create_future()
+        try:
+            if previous:
+                await asyncio.shield(previous)
+            await self._write_batch(game_id, pending, waiters)
+        finally:
+            done.set_result(None)
+            if self._writing.get(game_id) is done:
+                del self._writing[game_id]
+
+    async def _write_batch(self, game_id: str, pending: dict, waiters: list):
+        rows = [(player_id, day, time_slot, status) for (player_id, day, time_slot), status in pending.items()]
+        try:
+            written = await run_in_threadpool(self._write, game_id, rows)
+        except Exception as exc:
+            self.failed_flushes += 1
+            logger.exception("Failed to flush %d availability rows for game %s", len(rows), game_id)
+            for waiter, _ in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+
+        self.flushes += 1
+        self.rows_written += len(written)
+        # Rows for players deleted, or a game locked, while the batch was pending
+        self.rows_skipped += len(rows) - len(written)
+        for waiter, keys in waiters:
+            if waiter.done():
+                continue
+            if keys <= written:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(HTTPException(
+                    status_code=409, detail="Availability not saved: the player was removed or the game was locked"))
+
+    @staticmethod
+    def _write(game_id: str, rows: list[tuple]) -> set[tuple]:
+        with get_db() as conn:
+            return upsert_availability(conn.cursor(), game_id, rows)
+
+    async def flush(self, game_id: str):
+        """Write a game's pending saves now, and wait for any batch already being written."""
+        if game_id in self._pending:
+            await self._flush(game_id)
+        writing = self._writing.get(game_id)
+        if writing:
+            await asyncio.shield(writing)
+
+    async def drain(self):
+        """Flush every pending game immediately, e.g. on shutdown."""
+        for game_id in list(self._pending):
+            await self._flush(game_id)
+        for writing in list(self._writing.values()):
+            await asyncio.shield(writing)
+
+    def stats(self) -> dict:
+        return {
+            "ack": "flush" if self.ack_after_flush else "buffered",
+            "window_ms": int(self.window * 1000),
+            "updates_received": self.updates_received,
+            "rows_written": self.rows_written,
+            "rows_skipped": self.rows_skipped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "pending_games": len(self._pending),
+            "coalescing_ratio": round(self.updates_received / self.rows_written, 2) if self.rows_written else None,
+        }
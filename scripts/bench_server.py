@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Load-test a running server against the endpoints a game page hits.
+
+Usage:
+    python scripts/bench_server.py http://localhost:8000 GAME_ID
+
+Options:
+    --concurrency N  Parallel clients (default: 32)
+    --requests N     Total requests (default: 2000)
+
+Reports throughput, latency percentiles and errors. Run it against each
+server command you want to compare, on the same machine and database.
+"""
+
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url: str) -> tuple[float, bool]:
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as res:
+            res.read()
+        ok = True
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark game page endpoints")
+    parser.add_argument("base_url")
+    parser.add_argument("game_id")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    base = args.base_url.rstrip("/")
+    paths = [
+        f"/api/games/{args.game_id}",
+        f"/api/games/{args.game_id}/players",
+        f"/api/games/{args.game_id}/heatmap",
+        f"/api/games/{args.game_id}/bootstrap",
+        "/landing.html",
+    ]
+    urls = [base + paths[i % len(paths)] for i in range(args.requests)]
+
+    print(f"Warming up {base}...")
+    for url in urls[:len(paths)]:
+        fetch(url)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    errors = sum(1 for r in results if not r[1])
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    print(f"Requests:    {len(results)} ({errors} errors)")
+    print(f"Throughput:  {len(results) / elapsed:.1f} req/s")
+    print(f"Latency p50: {quantiles[49]:.1f} ms")
+    print(f"Latency p95: {quantiles[94]:.1f} ms")
+    print(f"Latency p99: {quantiles[98]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Check how many SQL statements each API route runs against checked-in budgets.
+
+Usage:
+    python scripts/check_query_budgets.py           # check, exit 1 on regressions
+    python scripts/check_query_budgets.py --update  # rewrite budgets from this run
+
+Runs every route in backend/main.py in-process against the local database in
+DATABASE_URL (seeded by the script itself), counts the statements each
+request executes and compares them with scripts/query_budgets.json. A route
+over budget fails with a diff of recorded vs. actual statements (recorded
+statements are stored by --update), and a route with no scenario fails too,
+so new endpoints must be added here.
+
+Requires httpx (for FastAPI's TestClient) and a local Postgres.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Keep limits and buffering from interfering with sequential measurements
+os.environ.setdefault("RATE_LIMIT_BURST", "100000")
+os.environ.setdefault("AVAILABILITY_FLUSH_MS", "0")
+os.environ.setdefault("AVAILABILITY_ACK", "flush")
+# No background jobs whose statements would land in a request's count
+os.environ["RETENTION_DAYS"] = "0"
+os.environ["MUTATION_RESULT_TTL_HOURS"] = "0"
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+import database
+from config import DATABASE_URL
+from main import app
+
+BUDGETS_FILE = Path(__file__).parent / "query_budgets.json"
+
+
+def scenarios(ctx: dict) -> list[dict]:
+    """One request per route, in an order where each finds the data it needs.
+
+    "route" is "METHOD path-template" as registered; "name" distinguishes
+    several scenarios of one route. Path parameters come from ctx unless
+    overridden in "path", where "$key" refers to a value saved by an earlier
+    scenario.
+    """
+    org = {"X-Organizer-Token": ctx["organizer_id"]}
+    game_body = {"title": "Budget game", "venue": "indoor", "game_date": ctx["game_date"], "organizer_pin": "1234"}
+    mutations = {"mutations": [
+        {"type": "join", "idempotency_key": "budget-join", "name": "Dana"},
+        {"type": "availability", "idempotency_key": "budget-availability", "day": "sunday",
+         "slots": {"09:00": "available"}},
+    ]}
+    return [
+        {"route": "POST /api/organizers", "json": {"id": str(uuid.uuid4()), "name": "Other organizer"}},
+        {"route": "GET /api/organizers/{organizer_id}"},
+        {"route": "PUT /api/organizers/{organizer_id}", "json": {"name": "Budget organizer"}, "headers": org},
+        {"route": "GET /api/organizers/{organizer_id}/games"},
+        {"route": "GET /api/organizers/{organizer_id}/conflicts"},
+        {"route": "GET /api/organizers/{organizer_id}/player-history", "params": {"q": "a"}},
+        {"route": "POST /api/games", "json": game_body, "headers": org, "save": ("new_game_id", "id")},
+        {"route": "GET /api/games"},
+        {"route": "GET /api/games/{game_id}"},
+        {"route": "GET /api/games/{game_id}/bootstrap"},
+        {"route": "PUT /api/games/{game_id}", "json": game_body, "headers": org},
+        {"route": "POST /api/games/{game_id}/verify-pin", "json": {"pin": "1234"}},
+        {"route": "POST /api/game-series", "headers": org, "save": ("series_id", "series_id"),
+         "json": {"template": game_body, "recurrence": {"frequency": "weekly", "count": 4},
+                  "copy_roster_from": ctx["game_id"]}},
+        {"route": "GET /api/game-series/{series_id}"},
+        {"route": "POST /api/games/{game_id}/players", "json": {"name": "Carol"}, "save": ("new_player_id", "id")},
+        {"route": "GET /api/games/{game_id}/players"},
+        {"route": "PUT /api/games/{game_id}/players/{player_id}", "json": {"name": "Bobby"}, "headers": org},
+        {"route": "PUT /api/games/{game_id}/players/{player_id}/availability", "headers": org,
+         "json": {"player_id": ctx["player_id"], "day": "sunday", "slots": {"09:00": "available", "10:00": "available"}}},
+        {"route": "POST /api/games/{game_id}/availability",
+         "json": {"player_id": ctx["player_id"], "day": "saturday", "slots": {"09:00": "available", "10:00": "unavailable"}}},
+        {"route": "POST /api/games/{game_id}/mutations", "json": mutations},
+        {"route": "POST /api/games/{game_id}/mutations", "name": "replay", "json": mutations},
+        {"route": "GET /api/games/{game_id}/availability"},
+        {"route": "GET /api/games/{game_id}/availability", "name": "since", "params": {"since": "0"}},
+        {"route": "GET /api/games/{game_id}/heatmap"},
+        {"route": "GET /api/games/{game_id}/heatmap.svg"},
+        {"route": "GET /api/games/{game_id}/heatmap.png"},
+        {"route": "GET /api/config"},
+        {"route": "GET /api/metrics"},
+        {"route": "GET /api/health"},
+        {"route": "GET /"},
+        {"route": "GET /landing.html"},
+        {"route": "GET /playeravail.html"},
+        {"route": "GET /playermode.html"},
+        {"route": "GET /static/{path:path}", "path": {"path": "landing.html"}},
+        {"route": "POST /api/games/{game_id}/lock", "headers": org, "path": {"game_id": "$new_game_id"}},
+        {"route": "GET /api/games/{game_id}", "name": "locked", "path": {"game_id": "$new_game_id"}},
+        {"route": "DELETE /api/games/{game_id}/lock", "headers": org, "path": {"game_id": "$new_game_id"}},
+        {"route": "DELETE /api/games/{game_id}/players/{player_id}", "headers": org,
+         "path": {"player_id": "$new_player_id"}},
+        {"route": "DELETE /api/games/{game_id}", "headers": org, "path": {"game_id": "$new_game_id"}},
+    ]
+
+
+def seed(client: TestClient) -> dict:
+    """Create an organizer, a game with two players and some availability."""
+    organizer_id = str(uuid.uuid4())
+    headers = {"X-Organizer-Token": organizer_id}
+    game_date = (date.today() + timedelta(days=3)).isoformat()
+
+    def ok(res):
+        if res.status_code != 200:
+            sys.exit(f"Seeding failed: {res.status_code} {res.text}")
+        return res.json()
+
+    ok(client.post("/api/organizers", json={"id": organizer_id, "name": "Budget organizer"}))
+    game = ok(client.post("/api/games", headers=headers, json={
+        "title": "Budget game", "venue": "indoor", "game_date": game_date, "organizer_pin": "1234",
+    }))
+    alice = ok(client.post(f"/api/games/{game['id']}/players", json={"name": "Alice"}))
+    ok(client.post(f"/api/games/{game['id']}/players", json={"name": "Bob"}))
+    ok(client.post(f"/api/games/{game['id']}/availability", json={
+        "player_id": alice["id"], "day": "saturday", "slots": {"09:00": "available", "11:00": "available"},
+    }))
+    return {"organizer_id": organizer_id, "game_id": game["id"], "player_id": alice["id"], "game_date": game_date}
+
+
+def normalize(statement: str) -> str:
+    """Collapse comments, whitespace and literals so statements diff stably across runs."""
+    statement = re.sub(r"--[^\n]*", "", statement)
+    statement = re.sub(r"\s+", " ", statement).strip()
+    statement = re.sub(r"'[^']*'", "?", statement)
+    statement = re.sub(r"\b\d+\b", "?", statement)
+    statement = re.sub(r"(\(\?(, ?\?)*\))(, ?\(\?(, ?\?)*\))+", r"\1, ...", statement)
+    return statement[:160]
+
+
+def run(client: TestClient, ctx: dict) -> dict:
+    """Run every scenario, returning {key: [statements]}."""
+    results = {}
+    for scenario in scenarios(ctx):
+        method, template = scenario["route"].split(" ", 1)
+        overrides = {k: ctx[v[1:]] if v.startswith("$") else v for k, v in scenario.get("path", {}).items()}
+        values = {**ctx, **overrides}
+        path = re.sub(r"\{(\w+)(?::\w+)?\}", lambda m: str(values[m[1]]), template)
+
+        database.statement_log = []
+        try:
+            res = client.request(method, path, params=scenario.get("params"),
+                                 json=scenario.get("json"), headers=scenario.get("headers"))
+            statements = database.statement_log
+        finally:
+            database.statement_log = None
+
+        key = scenario["route"] + (f" [{scenario['name']}]" if "name" in scenario else "")
+        if res.status_code != 200:
+            sys.exit(f"{key} returned {res.status_code}: {res.text}")
+        if "save" in scenario:
+            ctx[scenario["save"][0]] = res.json()[scenario["save"][1]]
+        results[key] = [normalize(s) for s in statements]
+    return results
+
+
+async def wait_for_startup():
+    await app.state.snapshot_task
+
+
+def registered_routes() -> set:
+    routes = set()
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            for method in route.methods - {"HEAD"}:
+                routes.add(f"{method} {route.path}")
+    return routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check SQL statement budgets per route")
+    parser.add_argument("--update", action="store_true", help="rewrite budgets from this run")
+    parser.add_argument("--force", action="store_true", help="allow a non-local DATABASE_URL")
+    args = parser.parse_args()
+
+    host = urlparse(DATABASE_URL).hostname
+    if host not in ("localhost", "127.0.0.1", "::1") and not args.force:
+        sys.exit(f"Refusing to seed data into non-local database host {host!r} (use --force)")
+
+    with TestClient(app) as client:
+        # Startup rebuilds missing snapshots in the background; let that finish
+        # so its queries are not counted against the first routes measured
+        client.portal.call(wait_for_startup)
+        ctx = seed(client)
+        results = run(client, ctx)
+
+    covered = {key.split(" [")[0] for key in results}
+    missing = sorted(registered_routes() - covered)
+
+    if args.update:
+        budgets = {key: {"budget": len(statements), "statements": statements}
+                   for key, statements in sorted(results.items())}
+        with open(BUDGETS_FILE, "w") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(budgets)} budgets to {BUDGETS_FILE}")
+        if missing:
+            print(f"Routes without a scenario: {', '.join(missing)}")
+        return
+
+    with open(BUDGETS_FILE) as f:
+        budgets = json.load(f)
+
+    failures = 0
+    for key, statements in sorted(results.items()):
+        recorded = budgets.get(key)
+        if recorded is None:
+            print(f"NEW   {key}: {len(statements)} statements, no budget recorded")
+            failures += 1
+            continue
+        if len(statements) > recorded["budget"]:
+            print(f"OVER  {key}: {len(statements)} statements, budget {recorded['budget']}")
+            diff = difflib.unified_diff(recorded.get("statements", []), statements,
+                                        "recorded", "actual", lineterm="")
+            for line in diff:
+                print(f"      {line}")
+            failures += 1
+        else:
+            print(f"ok    {key}: {len(statements)}/{recorded['budget']}")
+
+    for route in missing:
+        print(f"MISS  {route}: no scenario in check_query_budgets.py")
+        failures += 1
+
+    if failures:
+        print(f"\n{failures} route(s) failed their query budget")
+        sys.exit(1)
+    print("\nAll routes within budget")
+
+
+if __name__ == "__main__":
+    main()
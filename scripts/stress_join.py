@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Stress-test concurrent joins against a running server.
+
+Usage:
+    python scripts/stress_join.py http://localhost:8000
+
+Options:
+    --joiners N      Concurrent join requests (default: 40)
+    --names N        Distinct player names among them (default: 16)
+    --max-players N  Game capacity (default: 12)
+
+Creates a fresh game, fires all joins at once (many sharing a name), and
+checks that no request failed with a 5xx, every join of the same name got
+the same player, and the roster never exceeds max_players. Exits non-zero
+on any violation. Raise RATE_LIMIT_BURST on the server so joins are not
+rejected with 429.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+
+def request(method: str, url: str, body: dict = None) -> tuple[int, dict]:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as res:
+            return res.status, json.loads(res.read())
+    except urllib.error.HTTPError as err:
+        return err.code, json.loads(err.read() or b"{}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent join stress test")
+    parser.add_argument("base_url")
+    parser.add_argument("--joiners", type=int, default=40)
+    parser.add_argument("--names", type=int, default=16)
+    parser.add_argument("--max-players", type=int, default=12)
+    args = parser.parse_args()
+
+    api = args.base_url.rstrip("/") + "/api"
+    status, game = request("POST", f"{api}/games", {
+        "title": "Join stress test",
+        "venue": "indoor",
+        "game_date": date.today().isoformat(),
+        "max_players": args.max_players,
+    })
+    if status != 200:
+        print(f"Could not create game: {status} {game}")
+        sys.exit(1)
+    print(f"Created game {game['id']} (max {args.max_players} players)")
+
+    names = [f"Player {i % args.names}" for i in range(args.joiners)]
+    start = threading.Barrier(args.joiners)
+
+    def join(name: str):
+        start.wait()
+        return name, *request("POST", f"{api}/games/{game['id']}/players", {"name": name})
+
+    with ThreadPoolExecutor(max_workers=args.joiners) as pool:
+        results = list(pool.map(join, names))
+
+    failures = []
+    ids_by_name: dict[str, set] = {}
+    counts: dict[int, int] = {}
+    for name, status, body in results:
+        counts[status] = counts.get(status, 0) + 1
+        if status >= 500:
+            failures.append(f"{name}: {status} {body}")
+        elif status == 200:
+            ids_by_name.setdefault(name, set()).add(body["id"])
+        elif status != 409:
+            failures.append(f"{name}: unexpected {status} {body}")
+
+    for name, ids in ids_by_name.items():
+        if len(ids) > 1:
+            failures.append(f"{name} got several player ids: {sorted(ids)}")
+
+    _, players = request("GET", f"{api}/games/{game['id']}/players")
+    if len(players) > args.max_players:
+        failures.append(f"roster has {len(players)} players, max is {args.max_players}")
+
+    print(f"Responses by status: {dict(sorted(counts.items()))}")
+    print(f"Roster size: {len(players)}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK: no errors, no duplicates, no over-subscription")
+
+
+if __name__ == "__main__":
+    main()